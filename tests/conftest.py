@@ -0,0 +1,16 @@
+import  os
+import  sys
+
+import  pytest
+
+# vst.py and vst_bench.py live at the root of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import  vst_bench
+
+@pytest.fixture
+def synthetic_vcd(tmp_path):
+    """Writes a small synthetic VCD file with x/z values and returns its path."""
+    path = str(tmp_path / "synth.vcd")
+    vst_bench.generate_vcd(path, 4000, signals=40, widths=(1, 8, 32), density=0.2, xz_rate=0.02, seed=3)
+    return path
@@ -0,0 +1,8 @@
+import  vst_bench
+
+def test_scenarios_run_at_small_scale(tmp_path):
+    results = vst_bench.run_scenarios(["columns", "cycles"], str(tmp_path), 0.0001)
+    columns, cycles = results["scenarios"]["columns"], results["scenarios"]["cycles"]
+    assert columns["tuple_list_bytes"] > columns["column_bytes"]
+    assert cycles["files"] == cycles["cycles"]
+    assert set(vst_bench.result_stages(results)) == {"columns", "cycles"}
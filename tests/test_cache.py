@@ -0,0 +1,39 @@
+import  os
+
+import  pytest
+
+import  vst
+
+# Parse a VCD, through the cache, into a dict of histories by reference
+def parse(vcd_path, use_cache=True):
+    vcd = vst.VCDPARSE(vcd_path, use_cache=use_cache)
+    vcd.read_definitions()
+    vcd.read_value_changes()
+    return vcd, {reference: list(vcd[reference].tv) for reference in vcd.get_signals()}
+
+def truncate(path):
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) // 2 + 3)
+
+@pytest.mark.parametrize("damage", [truncate, os.remove])
+def test_damaged_columns_file_is_rebuilt(synthetic_vcd, damage):
+    _, expected = parse(synthetic_vcd, use_cache=False)
+    parse(synthetic_vcd)
+    damage(synthetic_vcd + ".vstcol")
+
+    vcd, histories = parse(synthetic_vcd)
+    assert histories == expected
+    # The sidecars were written again and serve the next run
+    vcd, histories = parse(synthetic_vcd)
+    assert histories == expected
+    assert vcd.stats["lines"] == 0
+
+def test_columns_damaged_after_definitions_are_read(synthetic_vcd):
+    _, expected = parse(synthetic_vcd, use_cache=False)
+    parse(synthetic_vcd)
+    vcd = vst.VCDPARSE(synthetic_vcd, use_cache=True)
+    vcd.read_definitions()
+    truncate(synthetic_vcd + ".vstcol")
+    vcd.read_value_changes()
+    assert {reference: list(vcd[reference].tv) for reference in vcd.get_signals()} == expected
+    assert parse(synthetic_vcd)[1] == expected
@@ -0,0 +1,36 @@
+import  os
+
+import  pytest
+
+import  vst
+
+# Parse a command line of vst.py
+def parse_args(monkeypatch, *argv):
+    monkeypatch.setattr(vst.sys, "argv", ["vst.py", *argv])
+    return vst.parse_args()
+
+# Read the files of an output folder
+def read_tree(folder):
+    return {name: open(os.path.join(folder, name), 'rb').read() for name in sorted(os.listdir(folder))}
+
+def test_config_follows_command_line_defaults(monkeypatch, synthetic_vcd):
+    config = vst.TrackerConfig.from_args(parse_args(monkeypatch, synthetic_vcd))
+    assert config.__dict__ == vst.TrackerConfig().__dict__
+    assert not vst.TrackerConfig.from_args(parse_args(monkeypatch, synthetic_vcd, "--no-cache")).use_cache
+
+@pytest.mark.parametrize("options", [[], ["-c", "500"], ["-c", "500", "--skip_idle_cycles"]])
+def test_command_line_writes_the_tracker_files(monkeypatch, synthetic_vcd, tmp_path, options):
+    argv = [synthetic_vcd, "-i", "top.u1", "-e", "top.en", "--no-cache", "-o", str(tmp_path / "cli"), *options]
+    args = parse_args(monkeypatch, *argv)
+    summary = vst.process_vcd_file(synthetic_vcd, args, interactive=False)
+
+    tracker = vst.VcdSignalTracker(synthetic_vcd, vst.TrackerConfig.from_args(args))
+    tracker.write_vcd(str(tmp_path / "library"))
+    assert summary["output"] == str(tmp_path / "cli" / "synth")
+    assert read_tree(summary["output"]) == read_tree(str(tmp_path / "library"))
+
+def test_command_line_hamming_outputs_are_counted(monkeypatch, synthetic_vcd, tmp_path):
+    output_folder = str(tmp_path / "hd")
+    args = parse_args(monkeypatch, synthetic_vcd, "-e", "top.en", "-c", "500", "-hd", "--no-cache", "-o", output_folder)
+    summary = vst.process_vcd_file(synthetic_vcd, args, interactive=False)
+    assert summary["metrics"]["counters"]["files_written"] == len(os.listdir(output_folder)) == 4
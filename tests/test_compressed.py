@@ -0,0 +1,17 @@
+import  gzip
+import  os
+import  shutil
+
+import  vst
+
+def test_compressed_and_plain_files_get_distinct_stems():
+    assert vst.vcd_stem("dumps/a.vcd") == "a"
+    assert vst.vcd_stem("dumps/a.vcd.gz") == "a_gz"
+    assert vst.vcd_stem("dumps/a.vcd.xz") == "a_xz"
+
+def test_decompressed_size_of_gzip_file(synthetic_vcd, tmp_path):
+    path = str(tmp_path / "a.vcd.gz")
+    with open(synthetic_vcd, 'rb') as f, gzip.open(path, 'wb') as g:
+        shutil.copyfileobj(f, g)
+    assert vst.decompressed_size(path) == os.path.getsize(synthetic_vcd)
+    assert vst.decompressed_size(synthetic_vcd) == os.path.getsize(synthetic_vcd)
@@ -0,0 +1,37 @@
+import  os
+import  zipfile
+
+import  vst
+
+# Tracker over the synthetic dump, with one group per top.en window
+def enable_tracker(vcd_path, **options):
+    return vst.VcdSignalTracker(vcd_path, vst.TrackerConfig(instances=["top.u1"], enable=["top.en"], clock=500, **options))
+
+def test_cycle_files_of_groups_do_not_collide(synthetic_vcd, tmp_path):
+    tracker = enable_tracker(synthetic_vcd)
+    assert len(tracker.windows()) > 1
+    tracker.write_vcd(str(tmp_path / "files"))
+    names = sorted(name for name in os.listdir(tmp_path / "files"))
+    assert names and all(name.startswith("group_") for name in names)
+
+    enable_tracker(synthetic_vcd, cycle_archive=True).write_vcd(str(tmp_path / "archive"))
+    with zipfile.ZipFile(tmp_path / "archive" / "cycles.zip") as archive:
+        members = archive.namelist()
+    assert len(members) == len(set(members))
+    assert sorted(members) == names
+
+def test_both_writers_cover_the_cycles_of_each_window(synthetic_vcd, tmp_path):
+    tracker = enable_tracker(synthetic_vcd)
+    tracker.write_vcd(str(tmp_path / "vcd"))
+    tracker.write_saif(str(tmp_path / "saif"))
+    vcd_names = sorted(name[:-len(".vcd")] for name in os.listdir(tmp_path / "vcd"))
+    saif_names = sorted(name[:-len(".saif")] for name in os.listdir(tmp_path / "saif"))
+    assert vcd_names == saif_names
+
+    cycle_times = tracker.cycles()
+    expected = sorted(f"group_{group_id}_cycle_{cycle_times[k]}"
+                      for group_id, (start, end) in enumerate(tracker.windows(), 1)
+                      for k in range(len(cycle_times) - 1)
+                      if cycle_times[k] <= end and cycle_times[k + 1] > start)
+    assert vcd_names == expected
+    assert len(expected) < len(tracker.windows()) * (len(cycle_times) - 1)
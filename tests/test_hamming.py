@@ -0,0 +1,46 @@
+import  os
+
+import  vst
+
+# Write the Hamming distances of a time window, with or without the cache
+def hamming_files(vcd_path, output_folder, time, use_cache):
+    tracker = vst.VcdSignalTracker(vcd_path, vst.TrackerConfig(time=time, use_cache=use_cache))
+    distances_path = tracker.write_hamming(output_folder)
+    summary_path = os.path.join(output_folder, f"hamming_summary_{os.path.basename(vcd_path)}.json")
+    with open(distances_path) as f, open(summary_path) as g:
+        return f.read(), g.read()
+
+def test_time_window_same_with_and_without_cache(synthetic_vcd, tmp_path):
+    # A fine time index, so the cached run starts parsing well after the beginning of the file
+    vcd = vst.VCDPARSE(synthetic_vcd, use_cache=True)
+    vcd.read_definitions()
+    vcd.cache.write_time_index(vcd.build_time_index(interval=4096))
+
+    time = (2500, 2600)
+    cached = hamming_files(synthetic_vcd, str(tmp_path / "cached"), time, use_cache=True)
+    uncached = hamming_files(synthetic_vcd, str(tmp_path / "uncached"), time, use_cache=False)
+    assert cached == uncached
+
+def test_time_window_only_reports_changes_inside(synthetic_vcd):
+    vcd = vst.VCDPARSE(synthetic_vcd)
+    vcd.read_definitions()
+    vcd.read_value_changes()
+    for signal in vcd.get_signals():
+        tv = vcd[signal].tv
+        full = vst.HammingDistance(tv, int(vcd[signal].size))
+        window = vst.HammingDistance(tv, int(vcd[signal].size), start_time=2500, end_time=2600)
+        assert list(window.distances) == [(time, hd) for time, hd in full.distances if 2500 <= time <= 2600]
+
+def test_window_and_cycle_sums_written_per_signal(synthetic_vcd, tmp_path):
+    tracker = vst.VcdSignalTracker(synthetic_vcd, vst.TrackerConfig(enable=["top.en"], clock=300))
+    distances = vst.HammingResults(tracker.write_hamming(str(tmp_path), "columnar"))
+    name = os.path.basename(synthetic_vcd)
+    window_sums = vst.HammingResults(str(tmp_path / f"hamming_window_sums_{name}.vsthd"))
+    cycle_sums = vst.HammingResults(str(tmp_path / f"hamming_cycle_sums_{name}.vsthd"))
+    windows, cycle_times = tracker.windows(), tracker.cycles()
+    for signal in distances:
+        changes = list(distances[signal])
+        expected = [(start, sum(hd for time, hd in changes if start <= time <= end)) for start, end in windows]
+        assert list(window_sums[signal]) == [entry for entry in expected if entry[1]]
+        expected = [(start, sum(hd for time, hd in changes if start <= time < end)) for start, end in zip(cycle_times, cycle_times[1:])]
+        assert list(cycle_sums[signal]) == [entry for entry in expected if entry[1]]
@@ -0,0 +1,33 @@
+import  pytest
+
+import  vst
+
+@pytest.mark.parametrize("timescale, magnitude, unit", [
+    ("$timescale 1ps $end", 1, "ps"),
+    ("$timescale 10 ns $end", 10, "ns"),
+    ("$timescale\n    100fs\n$end", 100, "fs"),
+    ("$timescale 1s $end", 1, "s"),
+])
+def test_timescale_unit_follows_the_keyword(tmp_path, timescale, magnitude, unit):
+    path = str(tmp_path / "t.vcd")
+    with open(path, 'w') as f:
+        f.write(f"{timescale}\n$scope module top $end\n$var wire 1 ! a $end\n$upscope $end\n$enddefinitions $end\n#0\n0!\n")
+    vcd = vst.VCDPARSE(path)
+    vcd.read_definitions()
+    assert vcd.get_timescale()["magnitude"] == magnitude
+    assert vcd.get_timescale()["unit"] == unit
+
+def test_parallel_parse_counts_each_line_once(synthetic_vcd, monkeypatch):
+    serial = vst.VCDPARSE(synthetic_vcd)
+    serial.read_definitions()
+    serial.read_value_changes()
+
+    # Small chunks, so the parse crosses many chunk boundaries
+    value_change_chunks = vst.VCDPARSE._value_change_chunks
+    monkeypatch.setattr(vst.VCDPARSE, "_value_change_chunks", lambda self, offset: value_change_chunks(self, offset, 4096))
+    parallel = vst.VCDPARSE(synthetic_vcd)
+    parallel.read_definitions()
+    parallel.read_value_changes(jobs=2)
+    assert len(parallel._value_change_chunks(parallel.body_offset)) > 2
+    for name in ("lines", "bytes_read", "changes_kept", "changes_dropped"):
+        assert parallel.stats[name] == serial.stats[name], name
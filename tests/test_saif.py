@@ -0,0 +1,30 @@
+import  os
+
+import  vst
+
+# The counts of the golden files were checked by hand: 10 ns timescale, a only has 0/1
+# toggles, b[1] goes 0 -> x -> 1 (IG), c starts at x and comes back from z to its last value.
+# In golden_enable.vcd, en and a both rise on the first time of the enable window (5, 24)
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+def test_native_saif_matches_golden_file(tmp_path):
+    tracker = vst.VcdSignalTracker(os.path.join(DATA, "golden.vcd"), vst.TrackerConfig(instances=["top"], use_cache=False))
+    tracker.write_saif(str(tmp_path))
+    assert read(tmp_path / "monitored_data_group_1.saif") == read(os.path.join(DATA, "golden.saif"))
+
+def test_native_saif_cycle_matches_golden_file(tmp_path):
+    tracker = vst.VcdSignalTracker(os.path.join(DATA, "golden.vcd"), vst.TrackerConfig(instances=["top"], clock=30, use_cache=False))
+    tracker.write_saif(str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == ["cycle_0.saif", "cycle_30.saif"]
+    assert read(tmp_path / "cycle_30.saif") == read(os.path.join(DATA, "golden_cycle_30.saif"))
+
+def test_native_saif_counts_toggles_at_window_start(tmp_path):
+    config = vst.TrackerConfig(instances=["top"], enable=["top.en"], use_cache=False)
+    tracker = vst.VcdSignalTracker(os.path.join(DATA, "golden_enable.vcd"), config)
+    assert tracker.windows() == [(5, 24)]
+    tracker.write_saif(str(tmp_path))
+    assert read(tmp_path / "monitored_data_group_1.saif") == read(os.path.join(DATA, "golden_enable.saif"))
@@ -0,0 +1,91 @@
+import  os
+
+import  pytest
+
+import  vst
+
+FAKE_VCD2SAIF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_vcd2saif")
+
+# Write small VCD files to convert
+def write_vcd_files(folder, names):
+    paths = []
+    for name in names:
+        path = os.path.join(folder, name + ".vcd")
+        with open(path, 'w') as f:
+            f.write("$enddefinitions $end\n#0\n0!\n#10\n1!\n")
+        paths.append(path)
+    return paths
+
+# Convert VCD files with the stand-in vcd2saif, returns the failures
+def convert(paths, jobs=1, remove_vcd=False, command=FAKE_VCD2SAIF):
+    converter = vst.SaifConverter(jobs, remove_vcd, command)
+    for path in paths:
+        converter.submit(path, os.path.splitext(path)[0] + ".saif")
+    return converter.close()
+
+def test_conversion_writes_saif_and_removes_logs(tmp_path):
+    paths = write_vcd_files(str(tmp_path), ["cycle_0", "cycle_10"])
+    assert convert(paths) == []
+    for path in paths:
+        base = os.path.splitext(path)[0]
+        with open(base + ".saif") as f:
+            assert "(DURATION 10)" in f.read()
+        assert os.path.exists(path)
+        assert not os.path.exists(base + ".vcd2saif.log")
+
+def test_failed_conversion_keeps_log_and_vcd(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_VCD2SAIF_FAIL", "bad")
+    paths = write_vcd_files(str(tmp_path), ["good", "bad"])
+    failures = convert(paths, remove_vcd=True)
+
+    bad_log = str(tmp_path / "bad.vcd2saif.log")
+    assert failures == [(paths[1], 2, bad_log, None)]
+    with open(bad_log) as f:
+        assert "cannot convert" in f.read()
+    assert os.path.exists(paths[1])
+    assert not os.path.exists(paths[0])  # Converted, so removed with remove_vcd
+    assert os.path.exists(str(tmp_path / "good.saif"))
+
+def test_missing_command_fails_every_file(tmp_path):
+    paths = write_vcd_files(str(tmp_path), ["a", "b"])
+    failures = convert(paths, command=str(tmp_path / "no_such_vcd2saif"))
+    assert [returncode for _, returncode, _, _ in failures] == [None, None]
+    with open(failures[0][2]) as f:
+        assert f.read().startswith("Cannot run")
+
+def test_raising_job_is_reported_with_the_others(tmp_path, monkeypatch, capsys):
+    paths = write_vcd_files(str(tmp_path), ["a", "b", "c"])
+    remove = os.remove
+    # Removing b.vcd fails, the other jobs still have to be reported
+    def fail_on_b(path):
+        if path == paths[1]:
+            raise PermissionError("b.vcd is read-only")
+        remove(path)
+    monkeypatch.setattr(vst.os, "remove", fail_on_b)
+    failures = convert(paths, remove_vcd=True)
+
+    assert failures == [(paths[1], 0, str(tmp_path / "b.vcd2saif.log"), "PermissionError: b.vcd is read-only")]
+    out = capsys.readouterr().out
+    assert "2 succeeded, 1 failed" in out
+    assert "PermissionError: b.vcd is read-only" in out
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_pool_runs_at_most_jobs_conversions(tmp_path, monkeypatch, jobs):
+    trace = str(tmp_path / "trace.txt")
+    monkeypatch.setenv("FAKE_VCD2SAIF_TRACE", trace)
+    monkeypatch.setenv("FAKE_VCD2SAIF_DELAY", "0.2")
+    assert convert(write_vcd_files(str(tmp_path), [f"cycle_{k}" for k in range(6)]), jobs=jobs) == []
+
+    running = peak = 0
+    with open(trace) as f:
+        for line in f:
+            running += 1 if line.startswith("start") else -1
+            peak = max(peak, running)
+    assert peak == jobs
+
+def test_tracker_converts_cycle_files(synthetic_vcd, tmp_path):
+    config = vst.TrackerConfig(instances=["top.u1"], clock=1000, vcd2saif=FAKE_VCD2SAIF, saif_jobs=2, remove_vcd_files=True)
+    output_folder = str(tmp_path / "out")
+    vst.VcdSignalTracker(synthetic_vcd, config).write_vcd(output_folder, saif=True)
+    names = sorted(os.listdir(output_folder))
+    assert names == [f"cycle_{time}.saif" for time in sorted(range(0, 4000, 1000), key=str)]
@@ -0,0 +1,27 @@
+import  vst
+
+# One bit signal with two changes at time 10: 1, then 0
+def duplicate_time_signal(tmp_path):
+    path = str(tmp_path / "dup.vcd")
+    with open(path, 'w') as f:
+        f.write("$timescale 1ns $end\n$scope module top $end\n$var wire 1 ! a $end\n$upscope $end\n$enddefinitions $end\n"
+                "#0\n0!\n#10\n1!\n0!\n#20\n1!\n")
+    vcd = vst.VCDPARSE(path)
+    vcd.read_definitions()
+    vcd.read_value_changes()
+    return vcd["top.a"]
+
+def test_first_change_is_seen_at_a_duplicate_time(tmp_path):
+    signal = duplicate_time_signal(tmp_path)
+    assert [signal[time] for time in (9, 10, 11, 20)] == ['0', '1', '0', '1']
+    assert signal.sample([9, 10, 10, 11, 19, 20]) == ['0', '1', '1', '0', '0', '1']
+    assert signal.sample(range(-2, 22)) == [signal[time] for time in range(-2, 22)]
+
+def test_sample_every_matches_getitem_at_a_duplicate_time(tmp_path):
+    signal = duplicate_time_signal(tmp_path)
+    assert signal.sample_every(1, 8, 13) == [(8, 2, '0'), (10, 1, '1'), (11, 2, '0')]
+    assert signal.sample_every(5, 0, 21) == [(0, 2, '0'), (10, 1, '1'), (15, 1, '0'), (20, 1, '1')]
+    for period, start in ((1, -3), (2, 0), (3, 1), (5, -5)):
+        runs = signal.sample_every(period, start, 25)
+        samples = [value for _, count, value in runs for _ in range(count)]
+        assert samples == [signal[time] for time in range(start, 25, period)]
@@ -0,0 +1,42 @@
+import  vst
+
+# Parse the definitions of a VCD with the cache enabled
+def cached_parser(vcd_path):
+    vcd = vst.VCDPARSE(vcd_path, use_cache=True)
+    vcd.read_definitions()
+    return vcd
+
+def test_time_index_file_matches_built_index(synthetic_vcd):
+    vcd = cached_parser(synthetic_vcd)
+    built = vcd.build_time_index(interval=4096)
+    vcd.cache.write_time_index(built)
+    opened = cached_parser(synthetic_vcd).cache.read_time_index()
+
+    assert len(built.times) > 10
+    assert opened.times == built.times and opened.offsets == built.offsets
+    numbers = range(len(vcd.data))
+    for k in (0, len(built.times) // 2, len(built.times) - 1):
+        assert opened.state(numbers, k) == built.state(numbers, k)
+
+def test_time_index_state_is_value_at_checkpoint(synthetic_vcd):
+    full = vst.VCDPARSE(synthetic_vcd)
+    full.read_definitions()
+    full.read_value_changes()
+
+    vcd = cached_parser(synthetic_vcd)
+    time_index = vcd.build_time_index(interval=4096)
+    k = len(time_index.times) // 2
+    checkpoint_time = time_index.times[k]
+    state = time_index.state(range(len(vcd.data)), k)
+    for number, identifier_code in enumerate(vcd.data):
+        tv = full.data[identifier_code].tv
+        # Last change before the #time line of the checkpoint
+        before = [change for change in tv if change[0] < checkpoint_time]
+        assert state.get(number) == (before[-1] if before else None)
+
+def test_stale_time_index_is_ignored(synthetic_vcd):
+    vcd = cached_parser(synthetic_vcd)
+    vcd.cache.write_time_index(vcd.build_time_index(interval=4096))
+    with open(synthetic_vcd, 'a') as f:
+        f.write("#999999\n")
+    assert cached_parser(synthetic_vcd).cache.read_time_index() is None
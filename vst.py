@@ -1,17 +1,45 @@
+import  abc
 import  argparse
-from    collections.abc import MutableMapping
+from    array import array
+from    collections import deque
+from    collections.abc import Mapping, MutableMapping
+from    concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from    contextlib import contextmanager, redirect_stderr, redirect_stdout
 import  bisect
+import  cProfile
+import  csv
+from    fnmatch import fnmatchcase
+import  gzip
+import  heapq
+import  io
+from    itertools import chain, compress, groupby, islice, repeat
+import  lzma
 import  math
+import  mmap
+import  queue
 import  re
 from    decimal import Decimal
+from    operator import and_, invert, itemgetter, le, or_, xor
 from    pprint import PrettyPrinter
 import  os
 from    os.path import basename
+import  subprocess
+import  sys
+import  threading
 import  time as time_module
-import  random
-import  string
+import  traceback
+import  struct
 import  json
+import  zipfile
 from    tqdm import tqdm
+try:
+    import  zstandard
+except ImportError:
+    zstandard = None
+try:
+    import  resource
+except ImportError:  # Not available on Windows
+    resource = None
 
 ##### Parse Command Line Arguments
 def parse_args():
@@ -21,74 +49,776 @@ def parse_args():
     parser.add_argument("-i","--instances", type=str, nargs='+', help="List of instance names to track")
     parser.add_argument("-t", "--time", nargs=2, type=int, help="Start time and end time of monitoring.")
     parser.add_argument("-c", "--clock", type=int, help="Clock period for each cycle.")
+    parser.add_argument("--clock_signal", help="Clock signal whose edges delimit the cycles, instead of a fixed --clock period.")
+    parser.add_argument("--clock_edge", choices=["rising", "falling", "both"], default="rising", help="Edges of --clock_signal that start a cycle.")
+    parser.add_argument("--skip_idle_cycles", action="store_true", help="With --clock or --clock_signal, write no files for cycles in which no monitored signal other than the clock changes.")
     parser.add_argument("-e", "--enable", nargs='*', help="Enable signal to monitor selected signals.")
+    parser.add_argument("--enable_mode", default="any", help="How multiple enable signals combine: 'any', 'all', or an expression over e0, e1, ... such as 'e0 and not e1'.")
     parser.add_argument("-saif", "--generate_saif_files", action="store_true", help="Generate SAIF files for each cycle.")
     parser.add_argument("-rmvcd", "--remove_vcd_files", action="store_true", help="Remove VCD files after generating SAIF files.")
+    parser.add_argument("--native_saif", action="store_true", help="Compute SAIF files in-process instead of writing VCD files and running vcd2saif.")
+    parser.add_argument("--saif-jobs", type=int, default=1, help="Number of vcd2saif conversions to run at the same time.")
+    parser.add_argument("--vcd2saif", default="vcd2saif", help="vcd2saif executable to use for SAIF generation.")
+    parser.add_argument("--identifier_order", choices=["scope", "toggles"], default="scope", help="Order of output identifier codes: by scope, or shortest codes for the most frequently changing signals.")
+    parser.add_argument("--cycle_archive", action="store_true", help="Pack the per-cycle VCD files into one cycles.zip archive instead of one file per cycle.")
     parser.add_argument("-o", "--output_folder", help="Output folder for generated VCD and SAIF files.")
     parser.add_argument("-hd", "--hamming_distance", action="store_true", help="Calculate Hamming distance for each signal.")
+    parser.add_argument("--hd-format", choices=sorted(HAMMING_WRITERS), default="json", help="Output format of the Hamming distances.")
+    parser.add_argument("--stream", action="store_true", help="Stream value changes straight into the group VCD files without keeping signal histories in memory.")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the parsed VCD cache next to the VCD file.")
+    parser.add_argument("--metrics", help="Write stage timings, counters and peak memory of the run to this JSON file.")
+    parser.add_argument("--profile", action="store_true", help="Run each stage under cProfile and write <output>/profile/<vcd>.<stage>.prof files.")
+    parser.add_argument("--batch", action="store_true", help="Process the VCD files in parallel worker processes, without prompts, writing a batch_manifest.json.")
+    parser.add_argument("--max-workers", type=int, help="Maximum number of VCD files processed at the same time with --batch (default: number of CPUs).")
+    parser.add_argument("--max-memory", type=int, help="Memory budget in MB for VCD files processed at the same time with --batch (default: half the physical memory).")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of worker processes for parsing value changes.")
     return parser.parse_args()
 
+##### Metrics
+# Peak resident memory in bytes of this process and of its finished child processes
+def peak_rss():
+    if resource is None:
+        return None
+    scale = 1 if sys.platform == 'darwin' else 1024  # ru_maxrss is in bytes on macOS, KB elsewhere
+    return {"self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+            "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale}
+
+# Total size in bytes and number of the files under a path
+def tree_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path), 1
+    size = files = 0
+    for folder, _, names in os.walk(path):
+        for name in names:
+            size += os.path.getsize(os.path.join(folder, name))
+            files += 1
+    return size, files
+
+# Write the summaries of processed VCD files, with their metrics, as JSON
+def write_metrics(path, results, seconds):
+    with open(path, 'w') as f:
+        json.dump({"files": results, "seconds": round(seconds, 3), "peak_rss": peak_rss()}, f, indent=4)
+    print(f"Metrics written to {path}.")
+
+class Metrics(object):
+    """
+    Stage timings and counters of one VCD file, written as JSON by --metrics.
+
+    stage() times a block in wall clock and CPU seconds; a stage entered more than once
+    adds up. With profile_path set, each stage also runs under its own cProfile profiler
+    and its stats are dumped to <profile_path>.<stage>.prof.
+    """
+
+    # Initialize the Metrics object
+    def __init__(self, profile_path=None):
+        self.profile_path = profile_path
+        self.stages = {}
+        self.counters = {}
+        self._profilers = {}
+
+    # Time a stage
+    @contextmanager
+    def stage(self, name):
+        profiler = None
+        if self.profile_path:
+            profiler = self._profilers.setdefault(name, cProfile.Profile())
+            profiler.enable()
+        start, start_cpu = time_module.perf_counter(), time_module.process_time()
+        try:
+            yield
+        finally:
+            self.record(name, time_module.perf_counter() - start, time_module.process_time() - start_cpu)
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(f"{self.profile_path}.{name}.prof")
+
+    # Add time spent in a stage
+    def record(self, name, seconds, cpu_seconds=None):
+        stage = self.stages.setdefault(name, {"seconds": 0.0, "cpu_seconds": 0.0, "calls": 0})
+        stage["seconds"] += seconds
+        if cpu_seconds is not None:
+            stage["cpu_seconds"] += cpu_seconds
+        stage["calls"] += 1
+
+    # Get the seconds spent in a stage
+    def seconds(self, name):
+        return self.stages[name]["seconds"]
+
+    # Add to a counter
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    # Get the stages, counters and peak memory as a JSON-ready dict
+    def report(self):
+        stages = {name: {key: round(value, 6) if isinstance(value, float) else value for key, value in stage.items()}
+                  for name, stage in self.stages.items()}
+        return {"stages": stages, "counters": dict(self.counters), "peak_rss": peak_rss()}
+
 ##### Enhance VCD Parsing Logic
 pp = PrettyPrinter()
 _RE_TYPE = type(re.compile(''))
 
+class ValueHistory(object):
+    """Columnar (time, value) history: int64 timestamps and int64 value codes.
+
+    Binary values of up to _PACK_BITS bits are packed as (int_value << 6) | length,
+    so the original string (including its width) is restored exactly. Anything else
+    (x/z bits, reals, wide buses) is interned in a per-history table under a negative code.
+    Indexing and iteration yield (time, value) tuples like the list this replaces.
+    """
+
+    _PACK_BITS = 56
+
+    # Initialize the ValueHistory object
+    def __init__(self):
+        self.times = array('q')
+        self.codes = array('q')
+        self._table = []
+        self._interned = {}
+
+    # Append a value change
+    def append(self, time, value):
+        self.times.append(time)
+        self.codes.append(self._encode(value))
+
+    # Encode a value string into an integer code
+    def _encode(self, value):
+        if len(value) <= self._PACK_BITS and not value.strip('01'):
+            return (int(value, 2) << 6) | len(value)
+        code = self._interned.get(value)
+        if code is None:
+            code = ~len(self._table)
+            self._interned[value] = code
+            self._table.append(value)
+        return code
+
+    # Decode an integer code back into the value string
+    def _decode(self, code):
+        if code < 0:
+            return self._table[~code]
+        return format(code >> 6, '0%db' % (code & 63))
+
+    # Append another history, re-interning its table into this one
+    def extend(self, other):
+        self.times.extend(other.times)
+        if not other._table:
+            self.codes.extend(other.codes)
+        else:
+            remap = [self._encode(value) for value in other._table]
+            self.codes.extend(array('q', (code if code >= 0 else remap[~code] for code in other.codes)))
+
+    # Write both columns to a binary file, returns the interning table
+    def tofile(self, f):
+        self.times.tofile(f)
+        self.codes.tofile(f)
+        return self._table
+
+    # Read count entries of both columns from a binary file written by tofile
+    def fromfile(self, f, count, table):
+        self.times.fromfile(f, count)
+        self.codes.fromfile(f, count)
+        for value in table:
+            self._interned[value] = ~len(self._table)
+            self._table.append(value)
+
+    # Iterate over the decoded values only
+    def values(self):
+        return map(self._decode, self.codes)
+
+    def __len__(self):
+        return len(self.times)
+
+    def __iter__(self):
+        return zip(self.times, self.values())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(zip(self.times[index], map(self._decode, self.codes[index])))
+        return (self.times[index], self._decode(self.codes[index]))
+
+    def __repr__(self):
+        return repr(list(self))
+
+class CountHistory(ValueHistory):
+    """Columnar (time, count) history for integer samples such as Hamming distances."""
+
+    def _encode(self, value):
+        return value
+
+    def _decode(self, code):
+        return code
+
+class Scope(object):
+    """A node of the scope trie: child scopes by name and the references of the signals declared in it."""
+
+    __slots__ = ("name", "path", "children", "signals")
+
+    # Initialize the Scope object
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.children = {}
+        self.signals = []
+
+    # Iterate over the scopes of the subtree, this one first
+    def walk(self):
+        stack = [self]
+        while stack:
+            scope = stack.pop()
+            yield scope
+            stack.extend(reversed(scope.children.values()))
+
+    # Iterate over the signal references of the subtree
+    def subtree_signals(self):
+        for scope in self.walk():
+            yield from scope.signals
+
+    def __repr__(self):
+        return f"Scope({self.path!r}, {len(self.children)} scopes, {len(self.signals)} signals)"
+
 class Signal(object):
     # Initialize the Signal object
     def __init__(self, size, var_type, identifier):
         self.size = size
         self.var_type = var_type
         self.identifier = identifier
-        self.tv = []
+        self.tv = ValueHistory()
         self.endtime = None
-        self.hamming_distance = []
     # Get the value of the signal at a specific time
     def __getitem__(self, time):
         if isinstance(time, slice):
             if not self.endtime:
-                self.endtime = self.tv[-1][0]
-            return [self[ii] for ii in range(*time.indices(self.endtime))]
+                self.endtime = self.tv.times[-1]
+            return self.sample(range(*time.indices(self.endtime)))
         elif isinstance(time, int):
-            if time < 0:
-                time = 0
-            left = bisect.bisect_left(self.tv, (time, ''))
-            if left == len(self.tv):
-                i = left - 1
-            else:
-                if self.tv[left][0] == time:
-                    i = left
-                else:
-                    i = left - 1
+            i = self._change_index(max(time, 0))
             if i == -1:
                 return None
             return self.tv[i][1]
         else:
             raise TypeError("Invalid argument type.")
+
+    # Index of the change giving the value at time: the first change at time, else the last one before it
+    def _change_index(self, time):
+        times = self.tv.times
+        i = bisect.bisect_left(times, time)
+        if i < len(times) and times[i] == time:
+            return i
+        return i - 1
+
+    # Get the values of the signal at many times
+    def sample(self, times):
+        """
+        Returns the value at each of the given times like self[time], None before the first change.
+
+        Sorted times are handled one run of equal values at a time, bisecting both the history and
+        the times, so the cost follows the number of changes sampled rather than the number of times.
+        """
+        if not isinstance(times, (list, range, array)):
+            times = list(times)
+        if isinstance(times, range):
+            ascending = times.step > 0
+        else:
+            ascending = all(map(le, times, islice(times, 1, None)))
+        if not ascending:
+            return [self[time] for time in times]
+        history_times = self.tv.times
+        codes = self.tv.codes
+        decode = self.tv._decode
+        values = []
+        k = 0
+        while k < len(times):
+            time = max(times[k], 0)
+            i = self._change_index(time)
+            if i + 1 < len(history_times) and history_times[i + 1] == time:
+                # Several changes at time: the first one is only seen at time itself
+                k_next = bisect.bisect_right(times, time, k)
+            elif i + 1 < len(history_times):
+                # Times before the next change all see change i
+                k_next = bisect.bisect_left(times, history_times[i + 1], k)
+            else:
+                k_next = len(times)
+            values.extend(repeat(decode(codes[i]) if i >= 0 else None, k_next - k))
+            k = k_next
+        return values
+
+    # Get the values of the signal at regular times, run-length encoded
+    def sample_every(self, period, start=0, end=None):
+        """
+        Samples the signal at start, start + period, ... before end (after the last change by
+        default) and returns runs of equal samples as (time of the first sample, number of
+        samples, value) tuples.
+
+        The work is proportional to the number of runs, not of samples, so sampling a slow
+        signal at every clock edge of a long simulation stays cheap.
+        """
+        if period <= 0:
+            raise ValueError("period must be positive")
+        history_times = self.tv.times
+        codes = self.tv.codes
+        if end is None:
+            end = history_times[-1] + 1 if history_times else start
+        num_samples = max(0, -(-(end - start) // period))
+        runs = []
+        k = 0
+        while k < num_samples:
+            time = start + k * period
+            i = self._change_index(max(time, 0))
+            if i + 1 < len(history_times) and history_times[i + 1] == max(time, 0):
+                # Several changes at the sampled time: the first one is only seen at that time
+                k_next = min(num_samples, (max(time, 0) - start) // period + 1)
+            else:
+                # Samples before the next change all see change i
+                next_time = history_times[i + 1] if i + 1 < len(history_times) else end
+                k_next = min(num_samples, -(-(next_time - start) // period))
+            code = codes[i] if i >= 0 else None
+            if runs and runs[-1][2] == code:
+                runs[-1][1] += k_next - k
+            else:
+                runs.append([time, k_next - k, code])
+            k = k_next
+        decode = self.tv._decode
+        return [(time, count, decode(code) if code is not None else None) for time, count, code in runs]
     # Set the value of the signal at a specific time
     def __repr__(self):
         return pp.pformat(self.__dict__)
     
+##### Parsed VCD Cache
+class VCDCache(object):
+    """Sidecar cache of a parsed VCD, keyed by the VCD's path, size and mtime.
+
+    <vcd>.vstidx is a JSON index holding the definitions and, per identifier code, the
+    offset, length and interning table of its columns in <vcd>.vstcol. The columns file
+    is raw int64 arrays appended as more signals get parsed, so each signal is read
+    back on its own by seeking to its columns.
+    """
+
+    VERSION = 5
+
+    # Initialize the VCDCache object and load the index if it is still valid
+    def __init__(self, vcd_path):
+        self.index_path = vcd_path + '.vstidx'
+        self.columns_path = vcd_path + '.vstcol'
+        self.time_index_path = vcd_path + '.vsttix'
+        stat = os.stat(vcd_path)
+        self.key = {
+            "version": self.VERSION,
+            "path": os.path.abspath(vcd_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "byteorder": sys.byteorder,
+        }
+        self.index = None
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            if index.get("key") == self.key:
+                self.index = index
+        except (OSError, ValueError):
+            pass
+
+    # Save the index, disabling the cache if the sidecar files can't be written
+    def _save(self):
+        try:
+            tmp_path = self.index_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.index, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Warning: cannot write VCD cache {self.index_path} ({e}). Continuing without cache.")
+            self.index = None
+
+    # Drop a cache whose sidecar files are damaged, so the VCD gets parsed and cached again
+    def discard(self, error):
+        print(f"Warning: VCD cache {self.index_path} is damaged ({error}). Parsing the VCD again.")
+        self.index = None
+        for path in (self.index_path, self.columns_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    # Check that the columns file holds every cached column
+    def _check_columns(self):
+        extent = max((entry["offset"] + 16 * entry["count"] for entry in self.index["columns"].values()), default=0)
+        size = os.path.getsize(self.columns_path)
+        if size < extent:
+            raise EOFError(f"{self.columns_path} has {size} bytes, {extent} expected")
+
+    # Restore definitions into a VCDPARSE object, returns False if the cache is not valid
+    def read_definitions(self, vcd):
+        if self.index is None:
+            return False
+        try:
+            self._check_columns()
+            self._read_definitions(vcd)
+        except (OSError, ValueError, EOFError, KeyError, TypeError, IndexError) as e:
+            self.discard(e)
+            vcd._clear_definitions()
+            return False
+        return True
+
+    def _read_definitions(self, vcd):
+        vcd.signals = list(self.index["signals"])
+        vcd.references_to_ids = dict(self.index["references_to_ids"])
+        scopes = []
+        for depth, name, signal_indices in self.index["scopes"]:
+            del scopes[depth:]
+            scope = vcd.hierarchy if depth == 0 else vcd._add_scope(scopes[-1], name)
+            scope.signals.extend(vcd.signals[i] for i in signal_indices)
+            scopes.append(scope)
+        for identifier_code, (size, var_type) in self.index["definitions"].items():
+            vcd.data[identifier_code] = Signal(size, var_type, identifier_code)
+            vcd.cur_sig_vals[identifier_code] = vcd.initial_value
+        vcd.timescale = {key: value if key == "unit" else Decimal(value) for key, value in self.index["timescale"].items()}
+        vcd.body_offset = self.index["body_offset"]
+        vcd.file_size = self.index["file_size"]
+
+    # Start a fresh cache from the definitions of a VCDPARSE object
+    def write_definitions(self, vcd):
+        # The scope trie in preorder as [depth, name, signal indices] entries
+        signal_indices = {reference: i for i, reference in enumerate(vcd.signals)}
+        scopes = []
+        stack = [(vcd.hierarchy, 0)]
+        while stack:
+            scope, depth = stack.pop()
+            scopes.append([depth, scope.name, [signal_indices[reference] for reference in scope.signals]])
+            stack.extend((child, depth + 1) for child in reversed(scope.children.values()))
+        self.index = {
+            "key": self.key,
+            "signals": vcd.signals,
+            "references_to_ids": vcd.references_to_ids,
+            "scopes": scopes,
+            "definitions": {identifier_code: [signal.size, signal.var_type] for identifier_code, signal in vcd.data.items()},
+            "timescale": {key: str(value) for key, value in vcd.timescale.items()},
+            "body_offset": vcd.body_offset,
+            "file_size": vcd.file_size,
+            "begintime": None,
+            "endtime": None,
+            "columns": {},
+        }
+        try:
+            open(self.columns_path, 'wb').close()
+        except OSError:
+            pass
+        self._save()
+
+    # Identifier codes that still have to be parsed from the VCD
+    def missing(self, identifier_codes):
+        columns = self.index["columns"]
+        return {identifier_code for identifier_code in identifier_codes if identifier_code not in columns}
+
+    # Append the parsed columns of the given identifier codes
+    def write_columns(self, vcd, identifier_codes):
+        try:
+            with open(self.columns_path, 'ab') as f:
+                for identifier_code in identifier_codes:
+                    signal = vcd.data[identifier_code]
+                    entry = {"offset": f.tell(), "count": len(signal.tv), "table": signal.tv.tofile(f)}
+                    self.index["columns"][identifier_code] = entry
+        except OSError as e:
+            print(f"Warning: cannot write VCD cache {self.columns_path} ({e}). Continuing without cache.")
+            self.index = None
+            return
+        self.index["begintime"] = vcd.begintime
+        self.index["endtime"] = vcd.endtime
+        self._save()
+
+    # Load the cached columns of the given identifier codes into a VCDPARSE object, returns
+    # False (with the cache discarded and the signals left empty) if the columns file is damaged
+    def read_columns(self, vcd, identifier_codes):
+        columns = self.index["columns"]
+        try:
+            with open(self.columns_path, 'rb') as f:
+                for identifier_code in sorted(identifier_codes, key=lambda code: columns[code]["offset"]):
+                    entry = columns[identifier_code]
+                    signal = vcd.data[identifier_code]
+                    f.seek(entry["offset"])
+                    signal.tv.fromfile(f, entry["count"], entry["table"])
+                    if signal.tv:
+                        vcd.cur_sig_vals[identifier_code] = signal.tv[-1][1]
+        except (OSError, ValueError, EOFError, KeyError, TypeError, IndexError) as e:
+            self.discard(e)
+            for identifier_code in identifier_codes:
+                vcd.data[identifier_code].tv = ValueHistory()
+                vcd.cur_sig_vals[identifier_code] = vcd.initial_value
+            return False
+        vcd.begintime = self.index["begintime"]
+        vcd.endtime = self.index["endtime"]
+        return True
+
+    # Open the time index written by write_time_index, or None if missing or stale
+    def read_time_index(self):
+        return TimeIndex.open(self.time_index_path, self.key)
+
+    # Persist a time index built by VCDPARSE.build_time_index
+    def write_time_index(self, time_index):
+        try:
+            tmp_path = self.time_index_path + '.tmp'
+            time_index.write(tmp_path, self.key)
+            os.replace(tmp_path, self.time_index_path)
+        except OSError as e:
+            print(f"Warning: cannot write VCD time index {self.time_index_path} ({e}).")
+
+class TimeIndex(object):
+    """
+    Sparse time index of a VCD: byte offsets of #time lines and the signal state at each of them.
+
+    Checkpoints are #time lines roughly every interval bytes. For each identifier, numbered in
+    definition order, the index holds the checkpoints before which it changed and its last
+    (time, value) there, as a checkpoint column next to a ValueHistory. The state at checkpoint
+    k is the last entry of each identifier at or before k, so nothing before k is replayed.
+
+    On disk (<vcd>.vsttix), the columns are raw int64 arrays followed by a directory of one
+    (offset, count, table length) record per identifier and a JSON footer. Opening the file
+    reads the footer and the checkpoint times and offsets only; state() seeks to the entries
+    of the requested identifiers.
+    """
+
+    MAGIC = b'VSTTIX2\n'
+
+    # Initialize the TimeIndex object
+    def __init__(self, interval, times, offsets, size, entries=None):
+        self.interval = interval
+        self.times = times
+        self.offsets = offsets
+        self.size = size
+        self._entries = entries  # Identifier number -> (checkpoints, ValueHistory), None when backed by a file
+        self._path = None
+        self._directory_offset = None
+
+    # Get the number of the last checkpoint not after time, -1 if there is none
+    def checkpoint(self, time):
+        return bisect.bisect_right(self.times, time) - 1
+
+    # Get the checkpoints and history of the entries of each identifier number
+    def _read_entries(self, numbers):
+        if self._entries is not None:
+            yield from ((number, self._entries[number]) for number in numbers if number in self._entries)
+            return
+        with open(self._path, 'rb') as f:
+            for number in sorted(numbers):
+                f.seek(self._directory_offset + 24 * number)
+                record = array('q')
+                record.fromfile(f, 3)
+                offset, count, table_length = record
+                if not count:
+                    continue
+                f.seek(offset + 24 * count)
+                table = json.loads(f.read(table_length)) if table_length else []
+                f.seek(offset)
+                checkpoints = array('q')
+                checkpoints.fromfile(f, count)
+                history = ValueHistory()
+                history.fromfile(f, count, table)
+                yield number, (checkpoints, history)
+
+    # Get the last (time, value) of the given identifier numbers at checkpoint k
+    def state(self, numbers, k):
+        state = {}
+        for number, (checkpoints, history) in self._read_entries(numbers):
+            j = bisect.bisect_right(checkpoints, k) - 1
+            if j >= 0:
+                state[number] = history[j]
+        return state
+
+    # Write the index to a file
+    def write(self, path, key):
+        with open(path, 'wb') as f:
+            f.write(self.MAGIC)
+            checkpoint_offset = f.tell()
+            self.times.tofile(f)
+            self.offsets.tofile(f)
+            directory = array('q', bytes(24 * self.size))
+            for number, (checkpoints, history) in sorted(self._entries.items()):
+                directory[3 * number] = f.tell()
+                directory[3 * number + 1] = len(checkpoints)
+                checkpoints.tofile(f)
+                table = history.tofile(f)
+                if table:
+                    table = json.dumps(table).encode()
+                    f.write(table)
+                    directory[3 * number + 2] = len(table)
+            footer = {"key": key, "interval": self.interval, "checkpoints": len(self.times), "size": self.size,
+                      "checkpoint_offset": checkpoint_offset, "directory_offset": f.tell()}
+            directory.tofile(f)
+            footer = json.dumps(footer).encode()
+            f.write(footer + struct.pack('<Q', len(footer)) + self.MAGIC)
+
+    # Open an index written by write, None if missing, stale or unreadable
+    @classmethod
+    def open(cls, path, key):
+        try:
+            with open(path, 'rb') as f:
+                f.seek(-(8 + len(cls.MAGIC)), os.SEEK_END)
+                tail = f.read()
+                if tail[8:] != cls.MAGIC:
+                    return None
+                footer_length = struct.unpack('<Q', tail[:8])[0]
+                f.seek(-(8 + len(cls.MAGIC) + footer_length), os.SEEK_END)
+                footer = json.loads(f.read(footer_length))
+                if footer.get("key") != key:
+                    return None
+                f.seek(footer["checkpoint_offset"])
+                times = array('q')
+                times.fromfile(f, footer["checkpoints"])
+                offsets = array('q')
+                offsets.fromfile(f, footer["checkpoints"])
+        except (OSError, ValueError, EOFError, struct.error):
+            return None
+        time_index = cls(footer["interval"], times, offsets, footer["size"])
+        time_index._path = path
+        time_index._directory_offset = footer["directory_offset"]
+        return time_index
+
+##### Compressed VCD Input
+# Open a zstd file, decoding all of its frames
+def _open_zstd(path):
+    if zstandard is None:
+        raise ImportError(f"Reading {path} needs the zstandard package (pip install zstandard).")
+    return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True, closefd=True)
+
+VCD_DECOMPRESSORS = {'.gz': gzip.open, '.xz': lzma.open, '.zst': _open_zstd}
+VCD_SUFFIXES = ('.vcd',) + tuple('.vcd' + suffix for suffix in VCD_DECOMPRESSORS)
+
+# Check if a VCD path is compressed
+def is_compressed(path):
+    return os.path.splitext(path)[1] in VCD_DECOMPRESSORS
+
+# Get the name of a VCD file without its directory and .vcd suffix, a.vcd.gz giving a_gz
+def vcd_stem(path):
+    name, suffix = os.path.splitext(os.path.basename(path))
+    if suffix in VCD_DECOMPRESSORS:
+        return os.path.splitext(name)[0] + '_' + suffix[1:]
+    return name
+
+# Typical compression ratios of VCD text, for formats that don't store the decompressed size
+_VCD_COMPRESSION_RATIOS = {'.gz': 10, '.xz': 15, '.zst': 10}
+
+# Estimated size of the decompressed text of a VCD file
+def decompressed_size(path):
+    """
+    Plain files give their size. Gzip files end with the decompressed size modulo 2**32; the
+    size with that remainder closest to the typical ratio is taken. Other compressed files
+    are estimated from their size and the typical ratio of their format.
+    """
+    size = os.path.getsize(path)
+    suffix = os.path.splitext(path)[1]
+    if suffix not in VCD_DECOMPRESSORS:
+        return size
+    estimate = size * _VCD_COMPRESSION_RATIOS[suffix]
+    if suffix == '.gz' and size >= 18:
+        with open(path, 'rb') as f:
+            f.seek(-4, os.SEEK_END)
+            remainder = struct.unpack('<I', f.read(4))[0]
+        return remainder + max(round((estimate - remainder) / (1 << 32)), 0) * (1 << 32)
+    return estimate
+
+class DecompressedStream(io.RawIOBase):
+    """Reads a .gz, .xz or .zst file as its decompressed bytes.
+
+    A background thread decompresses blocks ahead into a bounded queue, so decompression
+    (which releases the GIL) overlaps with parsing on the reading thread. Only forward
+    reads are supported; tell() is the position in the decompressed data.
+    """
+
+    # Initialize the DecompressedStream object and start decompressing
+    def __init__(self, path, block_size=1 << 20, depth=8):
+        super().__init__()
+        self._file = VCD_DECOMPRESSORS[os.path.splitext(path)[1]](path)
+        self._blocks = queue.Queue(depth)
+        self._stop = threading.Event()
+        self._block = memoryview(b'')
+        self._offset = 0
+        self._position = 0
+        self._eof = False
+        self._thread = threading.Thread(target=self._decompress, args=(block_size,), daemon=True)
+        self._thread.start()
+
+    # Decompress blocks into the queue until the end of the file, an error or close
+    def _decompress(self, block_size):
+        try:
+            while not self._stop.is_set():
+                block = self._file.read(block_size)
+                self._put(block)
+                if not block:
+                    return
+        except Exception as e:
+            self._put(e)
+
+    # Put an item into the queue unless the stream gets closed while waiting
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._offset == len(self._block):
+            if self._eof:
+                return 0
+            block = self._blocks.get()
+            if isinstance(block, Exception):
+                raise block
+            if not block:
+                self._eof = True
+                return 0
+            self._block = memoryview(block)
+            self._offset = 0
+        size = min(len(buffer), len(self._block) - self._offset)
+        buffer[:size] = self._block[self._offset:self._offset + size]
+        self._offset += size
+        self._position += size
+        return size
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._file.close()
+        super().close()
+
 class VCDPARSE(object):
 
+    # Progress bars are updated at most once per this many bytes
+    _PROGRESS_BYTES = 1 << 20
+
     # Character sets for value changes
     _VALUE = set(('0', '1', 'x', 'X', 'z', 'Z'))
     _VECTOR_VALUE_CHANGE = set(('b', 'B', 'r', 'R'))
+    # Byte codes of the same characters for the bytes-level tokenizer
+    _SCALAR_VALUE = {ord(value): value for value in _VALUE}
+    _VECTOR_VALUE_BYTES = frozenset(ord(value) for value in _VECTOR_VALUE_CHANGE)
 
     # Initialize the VCDPARSE object
-    def __init__(self, vcd_path=None, signals=None, store_tvs=True, initial_value='0'):
+    def __init__(self, vcd_path=None, signals=None, store_tvs=True, initial_value='0', use_cache=False):
         # Persistent attributes
         self.vcd_path = vcd_path
-        self.hierarchy = {}
+        self.hierarchy = Scope("", "")
         self.scopes = {}
+        self._scope_names = {}
         self.data = {}
         self.endtime = 0
         self.begintime = 0
-        self.total_line = 0
+        self.body_offset = 0
+        self.file_size = 0
         self.references_to_ids = {}
+        self.selected_ids = None
         self.signals = signals if signals else []
         self.timescale = {}
         self._store_tvs = store_tvs
         self.initial_value = initial_value
         self.cur_sig_vals = {}
+        self.cache = VCDCache(vcd_path) if use_cache else None
+        self.stats = {"lines": 0, "bytes_read": 0, "changes_kept": 0, "changes_dropped": 0}
         self.factor = {
             "s": '1e0',
             "ms": '1e-3',
@@ -98,31 +828,72 @@ class VCDPARSE(object):
             "fs": '1e-15',
         }
 
+    # Open the VCD
+    @contextmanager
+    def _open(self, offset=0):
+        """Yields the VCD text positioned at offset, with readline(), read() and tell().
+
+        Plain files are memory mapped. Compressed files are decompressed on the fly, so
+        reaching offset means decompressing (but not parsing) everything before it.
+        """
+
+        if not is_compressed(self.vcd_path):
+            with open(self.vcd_path, 'rb') as vcd_file, mmap.mmap(vcd_file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                mm.seek(offset)
+                yield mm
+            return
+        with io.BufferedReader(DecompressedStream(self.vcd_path), 1 << 20) as stream:
+            while stream.tell() < offset and stream.read(min(offset - stream.tell(), 1 << 24)):
+                pass
+            yield stream
+
+    # Forget definitions restored in part from a damaged cache
+    def _clear_definitions(self):
+        self.hierarchy = Scope("", "")
+        self.scopes = {}
+        self._scope_names = {}
+        self.data = {}
+        self.references_to_ids = {}
+        self.signals = []
+        self.timescale = {}
+        self.cur_sig_vals = {}
+
+    # Get the number of bytes from offset to the end, None if not known
+    def _remaining(self, offset):
+        return self.file_size - offset if self.file_size is not None else None
+
     # Read Scopes and Signals
     def read_definitions(self):
         """Parses the header part to get scopes and signal definitions."""
 
+        if self.cache is not None and self.cache.read_definitions(self):
+            return
+
         hier = []
+        scopes = [self.hierarchy]
+
+        with self._open() as mm:
 
-        with open(self.vcd_path, 'r') as vcd_file:
-            
             # Parsing logic for definitions
-            for line in vcd_file:
+            for line in iter(mm.readline, b''):
+                line = line.decode()
                 if '$enddefinitions' in line:
                     break
                 # Handle scopes
                 elif '$scope' in line:
                     scope_name = line.split()[2]
                     hier.append(scope_name)
+                    scopes.append(self._add_scope(scopes[-1], scope_name))
                 elif '$upscope' in line:
                     hier.pop()
+                    scopes.pop()
                 elif '$var' in line:
                     ls = line.split()
                     type = ls[1]
                     size = ls[2]
                     identifier_code = ls[3]
                     name = ''.join(ls[4:-1])
-                    path = '.'.join(hier)
+                    path = scopes[-1].path
 
                     if path:
                         reference = path + '.' + name
@@ -130,6 +901,7 @@ class VCDPARSE(object):
                         reference = name
 
                     self.signals.append(reference)
+                    scopes[-1].signals.append(reference)
                     self.data[identifier_code] = Signal(size, type, identifier_code)
                     self.references_to_ids[reference] = identifier_code
                     self.cur_sig_vals[identifier_code] = self.initial_value
@@ -137,90 +909,511 @@ class VCDPARSE(object):
                 elif '$timescale' in line:
                     if '$end' not in line:
                         while True:
-                            line += " " + vcd_file.readline().strip().rstrip()
+                            line += " " + mm.readline().decode().strip()
                             if '$end' in line:
                                 break
-                    magnitude = Decimal(re.findall(r"\d+|$", line)[0])
-                    unit = re.findall(r"s|ms|us|ns|ps|fs", line)[0]
+                    # Look for the unit after the keyword, "$timescale" itself ends in "s"
+                    magnitude, unit = re.search(r"(\d+)\s*(fs|ps|ns|us|ms|s)\b", line.split('$timescale', 1)[1]).groups()
+                    magnitude = Decimal(magnitude)
                     factor = self.factor[unit]
                     self.timescale["timescale"] = magnitude * Decimal(factor)
                     self.timescale["magnitude"] = magnitude
                     self.timescale["unit"] = unit
                     self.timescale["factor"] = Decimal(factor)
-            
-            self.total_line = sum(1 for _ in vcd_file)
 
-    # Read Value Changes
-    def read_value_changes(self,start_time=None, end_time=None):
-        """Parses value changes based on selected signals after definitions are parsed."""
+            # Value changes start right after the definitions, the size of compressed text is not known
+            self.body_offset = mm.tell()
+            self.file_size = len(mm) if isinstance(mm, mmap.mmap) else None
+
+        if self.cache is not None:
+            self.cache.write_definitions(self)
+
+    # Select Signals to Track
+    def select(self, references):
+        """Restricts value change parsing to the given hierarchical references."""
+
+        wanted = set()
+        for reference in references:
+            if reference not in self.references_to_ids:
+                raise KeyError(reference)
+            wanted.add(reference)
+
+        # Aliased references share one identifier code, so selection is done per code
+        self.selected_ids = {self.references_to_ids[reference] for reference in wanted}
+        self.signals = [reference for reference in self.references_to_ids if reference in wanted]
+        return self.selected_ids
+
+    # Add a scope to the trie, or get it if it was declared before
+    def _add_scope(self, parent, name):
+        scope = parent.children.get(name)
+        if scope is None:
+            path = parent.path + '.' + name if parent.path else name
+            scope = parent.children[name] = Scope(name, path)
+            self.scopes[path] = scope
+            self._scope_names.setdefault(name, []).append(scope)
+        return scope
+
+    # Find Scopes
+    def find_scopes(self, name):
+        """Returns the scopes whose path is name or ends with '.' + name.
+
+        Candidates are looked up by their last name only; if none match, scope paths merely
+        ending with name (such as 'top.myDUT' for 'DUT') are returned instead.
+        """
+
+        last_name = name.rsplit('.', 1)[-1]
+        suffix = '.' + name
+        matches = [scope for scope in self._scope_names.get(last_name, ()) if scope.path == name or scope.path.endswith(suffix)]
+        if not matches:
+            matches = [scope for path, scope in self.scopes.items() if path.endswith(name)]
+        return matches
+
+    # Find Signals
+    def find_signals(self, name):
+        """Returns the references that are name or end with '.' + name, or else contain name.
+
+        For a dotted name, the scope part is resolved with find_scopes and only those scopes
+        are looked at; a plain signal name is compared with every reference.
+        """
+
+        if name in self.references_to_ids:
+            return [name]
+        scope_name, _, signal_name = name.rpartition('.')
+        if scope_name:
+            references = (scope.path + '.' + signal_name for scope in self.find_scopes(scope_name))
+            matches = [reference for reference in references if reference in self.references_to_ids]
+        else:
+            suffix = '.' + name
+            matches = [reference for reference in self.references_to_ids if reference.endswith(suffix)]
+        if not matches:
+            matches = find_signals_with_string(self.references_to_ids, name)
+        return matches
+
+    # Get the signal references below scopes
+    def subtree_signals(self, paths):
+        """Returns the references of all signals in or below the scopes with the given paths, without duplicates."""
+
+        return list(dict.fromkeys(chain.from_iterable(self.scopes[path].subtree_signals() for path in paths)))
+
+    # Query Signals and Scopes
+    def query(self, pattern):
+        """Returns the signal references and scope paths matching pattern.
+
+        pattern is a compiled regex, searched in each name as __getitem__ does, or a glob string
+        such as 'top.dut.*' or 'top.*.valid' matched with fnmatch rules. Only the subtree of the
+        scope named by the literal start of the pattern is scanned: the text before the first
+        wildcard of a glob, or of a regex anchored with '^'.
+        """
+
+        if isinstance(pattern, _RE_TYPE):
+            match = pattern.search
+            prefix = ''
+            literal = re.match(r'\^((?:[^\\.^$*+?{}\[\]|()]|\\\.)*)(.?)', pattern.pattern)
+            if literal and '|' not in pattern.pattern and not pattern.flags & re.IGNORECASE:
+                prefix = literal.group(1)
+                if literal.group(2) in ('?', '*', '{'):  # The last literal character is optional
+                    prefix = prefix[:-2] if prefix.endswith('\\.') else prefix[:-1]
+                prefix = prefix.replace('\\.', '.')
+        else:
+            match = lambda name: fnmatchcase(name, pattern)
+            prefix = re.split(r'[*?[]', pattern, 1)[0]
 
-        def handle_value_change(line):
-            value = line[0]
-            identifier_code = line[1:]
-            if identifier_code in self.data:
-                self._add_value_identifier_code(time, value, identifier_code)
-                
+        # Descend along the complete scope names of the prefix
+        scope = self.hierarchy
+        for name in prefix.split('.')[:-1]:
+            child = scope.children.get(name)
+            if child is None:
+                break
+            scope = child
 
-        def handle_vector_value_change(line):
-            value, identifier_code = line[1:].split()
-            if identifier_code in self.data:
-                self._add_value_identifier_code(time, value, identifier_code)
+        signals = [reference for reference in scope.subtree_signals() if match(reference)]
+        scopes = [child.path for child in scope.walk() if child.path and match(child.path)]
+        return signals + scopes
 
+    # Read Value Changes
+    def read_value_changes(self, start_time=None, end_time=None, jobs=1):
+        """Parses value changes based on selected signals after definitions are parsed."""
+
+        # Only full-range histories are cached
+        if self.cache is not None and self.cache.index is not None and start_time is None and end_time is None:
+            return self._read_value_changes_cached(jobs)
+        # Late windows seek through the persisted time index instead of scanning from the start
+        if self.cache is not None and self.cache.index is not None and start_time is not None:
+            time_index = self.cache.read_time_index()
+            if time_index is None:
+                time_index = self.build_time_index()
+                self.cache.write_time_index(time_index)
+            return self._parse_value_changes(start_time, end_time, jobs, self._seek_time_index(time_index, start_time))
+        self._parse_value_changes(start_time, end_time, jobs)
+
+    # Build Time Index
+    def build_time_index(self, interval=None):
+        """Scans all value changes once and returns a sparse TimeIndex.
+
+        A checkpoint is the [time, byte offset] of a #time line roughly every interval bytes
+        (by default 1/1024 of the value change section, at least 1 MB and at least 1 KB per
+        identifier, so the index stays within a few percent of the VCD size). At each checkpoint,
+        every identifier that changed since the previous one gets an entry with its last
+        [time, value], which gives the signal state at that offset without reading anything
+        before it.
+        """
+
+        scalar_values = self._SCALAR_VALUE
+        vector_values = self._VECTOR_VALUE_BYTES
+        numbers = {identifier_code.encode(): number for number, identifier_code in enumerate(self.data)}
+        times = array('q')
+        offsets = array('q')
+        entries = {}
+        changed = {}
         time = 0
-        first_time = True
+        next_checkpoint = self.body_offset
+        if interval is None:
+            interval = max(1 << 20, (self._remaining(self.body_offset) or 0) >> 10, len(self.data) << 10)
 
-        with open(self.vcd_path, 'r') as vcd_file, tqdm(total=self.total_line, desc="Reading VCD", unit=" lines") as pbar:
+        with self._open(self.body_offset) as mm, \
+             tqdm(total=self._remaining(self.body_offset), desc="Indexing VCD", unit="B", unit_scale=True) as pbar:
+            reported = self.body_offset
 
-            for line in vcd_file:
-                pbar.update(1)
+            for line in iter(mm.readline, b''):
                 line0 = line[0]
-                if line == '':
+                if line0 == 35:  # '#'
+                    time = int(line.split()[0][1:])
+                    position = mm.tell()
+                    offset = position - len(line)
+                    if offset >= next_checkpoint:
+                        for identifier_code, (change_time, value) in changed.items():
+                            number = numbers.get(identifier_code)
+                            if number is None:
+                                continue
+                            entry = entries.get(number)
+                            if entry is None:
+                                entry = entries[number] = (array('q'), ValueHistory())
+                            entry[0].append(len(times))
+                            entry[1].append(change_time, value.decode())
+                        times.append(time)
+                        offsets.append(offset)
+                        changed = {}
+                        next_checkpoint = offset + interval
+                        pbar.update(position - reported)
+                        reported = position
+                elif line0 in vector_values:
+                    value, identifier_code = line[1:].split()
+                    changed[identifier_code] = (time, value)
+                elif line0 in scalar_values:
+                    changed[line[1:].rstrip()] = (time, line[:1])
+
+            pbar.update(mm.tell() - reported)
+
+        return TimeIndex(interval, times, offsets, len(self.data), entries)
+
+    # Seek Time Index
+    def _seek_time_index(self, time_index, start_time):
+        """Seeds the selected signals with their state at the last checkpoint not after start_time.
+
+        Returns the byte offset of that checkpoint to resume parsing from.
+        """
+
+        k = time_index.checkpoint(start_time)
+        if k < 0:
+            return self.body_offset
+
+        ids = self.selected_ids if self.selected_ids is not None else self.data
+        identifier_codes = list(self.data)
+        numbers = {identifier_code: number for number, identifier_code in enumerate(identifier_codes)}
+        for number, (time, value) in time_index.state([numbers[identifier_code] for identifier_code in ids], k).items():
+            identifier_code = identifier_codes[number]
+            self.data[identifier_code].tv.append(time, value)
+            self.cur_sig_vals[identifier_code] = value
+        return time_index.offsets[k]
+
+    # Read Value Changes through the Cache
+    def _read_value_changes_cached(self, jobs):
+        """Loads cached signals and parses (then caches) only the ones not cached yet."""
+
+        identifier_codes = set(self.selected_ids if self.selected_ids is not None else self.data)
+        missing = self.cache.missing(identifier_codes)
+        if missing:
+            selected_ids = self.selected_ids
+            self.selected_ids = missing
+            self._parse_value_changes(None, None, jobs)
+            self.selected_ids = selected_ids
+            self.cache.write_columns(self, missing)
+        writable = self.cache.index is not None
+        if writable and self.cache.read_columns(self, identifier_codes - missing):
+            return
+        # Cache became unwritable after the partial parse or its columns are damaged, parse the rest directly
+        selected_ids = self.selected_ids
+        self.selected_ids = identifier_codes - missing
+        self._parse_value_changes(None, None, jobs)
+        self.selected_ids = selected_ids
+        if writable:
+            # Start the damaged cache again from what is now parsed
+            self.cache.write_definitions(self)
+            if self.cache.index is not None:
+                self.cache.write_columns(self, identifier_codes)
+
+    # Parse Value Changes from the VCD
+    def _parse_value_changes(self, start_time, end_time, jobs, offset=None):
+        offset = self.body_offset if offset is None else offset
+        if jobs > 1:
+            return self._read_value_changes_parallel(start_time, end_time, jobs, offset)
+
+        with self._open(offset) as mm, \
+             tqdm(total=self._remaining(offset), desc="Reading VCD", unit="B", unit_scale=True) as pbar:
+            self._read_value_change_section(mm, None, start_time, end_time, pbar)
+
+    # Parse Value Change Section
+    def _read_value_change_section(self, vcd_file, end=None, start_time=None, end_time=None, pbar=None):
+        """Tokenizes value change lines as bytes from the current position of vcd_file up to end.
+
+        Identifiers are matched as bytes; only identifiers and values that are kept get decoded.
+        Lines, bytes and kept/dropped changes are added to self.stats.
+        Returns True if end_time was reached.
+        """
+
+        # Selected identifier codes as bytes, mapped to their str form
+        ids = self.selected_ids if self.selected_ids is not None else self.data
+        selected_ids = {identifier_code.encode(): identifier_code for identifier_code in ids}
+        scalar_values = self._SCALAR_VALUE
+        vector_values = self._VECTOR_VALUE_BYTES
+        progress_bytes = self._PROGRESS_BYTES
+        kept = -sum(len(self.data[identifier_code].tv) for identifier_code in ids)
+
+        time = 0
+        first_time = True
+        reached_end_time = False
+        lines = dropped = 0
+        unread = 0  # Length of the line of the next section, read but not counted
+        start = reported = vcd_file.tell()
+
+        for lines, line in enumerate(iter(vcd_file.readline, b''), 1):
+            line0 = line[0]
+            # Handle time step
+            if line0 == 35:  # '#'
+                position = vcd_file.tell()
+                if end is not None and position - len(line) >= end:
+                    lines -= 1
+                    unread = len(line)
+                    break
+                if pbar is not None and position - reported >= progress_bytes:
+                    pbar.update(position - reported)
+                    reported = position
+                time = int(line.split()[0][1:])
+                if end_time is not None and time > end_time:
+                    reached_end_time = True
                     break
-                line = line.strip()
-                if line == '':
+                elif start_time is not None and time < start_time:
                     continue
-                # Handle time step
-                elif line0 == '#':
-                    time = int(line.split()[0][1:])
-                    if end_time is not None and time > end_time:
-                        break
-                    elif start_time is not None and time < start_time:
-                        continue
-                    elif first_time:
-                        self.begintime = time
-                        first_time = False
-                    self.endtime = time
+                elif first_time:
+                    self.begintime = time
+                    first_time = False
+                self.endtime = time
+
+            # Handle value change for a more than one bit signal
+            elif line0 in vector_values:
+                value, identifier_code = line[1:].split()
+                identifier_code = selected_ids.get(identifier_code)
+                if identifier_code is not None:
+                    self._add_value_identifier_code(time, value.decode(), identifier_code)
+                else:
+                    dropped += 1
+            # Handle value change for a single bit signal
+            elif line0 in scalar_values:
+                identifier_code = selected_ids.get(line[1:].rstrip())
+                if identifier_code is not None:
+                    self._add_value_identifier_code(time, scalar_values[line0], identifier_code)
+                else:
+                    dropped += 1
+
+        position = vcd_file.tell() - unread
+        if pbar is not None:
+            pbar.update(position - reported)
+        stats = self.stats
+        stats["lines"] += lines
+        stats["bytes_read"] += position - start
+        stats["changes_kept"] += kept + sum(len(self.data[identifier_code].tv) for identifier_code in ids)
+        stats["changes_dropped"] += dropped
+        return reached_end_time
+
+    # Iterate Value Changes
+    def iter_value_changes(self, start_time=None, end_time=None):
+        """Streams value changes of the selected signals without storing them.
+
+        Yields (time, changes) per #time block in file order, changes being a list of
+        (identifier_code, value). Blocks before start_time are yielded as well so callers
+        can track signal state; begintime and endtime are updated as read_value_changes does,
+        and self.stats as _read_value_change_section does.
+        """
+
+        ids = self.selected_ids if self.selected_ids is not None else self.data
+        selected_ids = {identifier_code.encode(): identifier_code for identifier_code in ids}
+        scalar_values = self._SCALAR_VALUE
+        vector_values = self._VECTOR_VALUE_BYTES
+        progress_bytes = self._PROGRESS_BYTES
+
+        time = 0
+        first_time = True
+        changes = []
+        lines = kept = dropped = 0
+
+        with self._open(self.body_offset) as mm, \
+             tqdm(total=self._remaining(self.body_offset), desc="Streaming VCD", unit="B", unit_scale=True) as pbar:
+            reported = self.body_offset
+
+            try:
+                for lines, line in enumerate(iter(mm.readline, b''), 1):
+                    line0 = line[0]
+                    # Handle time step, handing over the finished block first
+                    if line0 == 35:  # '#'
+                        if changes:
+                            kept += len(changes)
+                            yield time, changes
+                            changes = []
+                        position = mm.tell()
+                        if position - reported >= progress_bytes:
+                            pbar.update(position - reported)
+                            reported = position
+                        time = int(line.split()[0][1:])
+                        if end_time is not None and time > end_time:
+                            return
+                        elif start_time is not None and time < start_time:
+                            continue
+                        elif first_time:
+                            self.begintime = time
+                            first_time = False
+                        self.endtime = time
+
+                    # Handle value change for a more than one bit signal
+                    elif line0 in vector_values:
+                        value, identifier_code = line[1:].split()
+                        identifier_code = selected_ids.get(identifier_code)
+                        if identifier_code is not None:
+                            changes.append((identifier_code, value.decode()))
+                        else:
+                            dropped += 1
+                    # Handle value change for a single bit signal
+                    elif line0 in scalar_values:
+                        identifier_code = selected_ids.get(line[1:].rstrip())
+                        if identifier_code is not None:
+                            changes.append((identifier_code, scalar_values[line0]))
+                        else:
+                            dropped += 1
+
+                if changes:
+                    kept += len(changes)
+                    yield time, changes
+            finally:
+                position = mm.tell()
+                pbar.update(position - reported)
+                stats = self.stats
+                stats["lines"] += lines
+                stats["bytes_read"] += position - self.body_offset
+                stats["changes_kept"] += kept
+                stats["changes_dropped"] += dropped
+
+    # Split Value Changes into Chunks
+    def _value_change_chunks(self, offset, chunk_bytes=64 << 20):
+        """Returns (offset, length) byte ranges from offset to the end, each starting on a #time line.
+
+        Compressed files can't be addressed by offset, so their decompressed text is yielded
+        instead, in pieces of about chunk_bytes / 4 split the same way.
+        """
+
+        if is_compressed(self.vcd_path):
+            return self._decompressed_chunks(offset, chunk_bytes >> 2)
+
+        with open(self.vcd_path, 'rb') as vcd_file, mmap.mmap(vcd_file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            bounds = [offset]
+            while bounds[-1] + chunk_bytes < size:
+                boundary = mm.find(b'\n#', bounds[-1] + chunk_bytes)
+                if boundary == -1:
+                    break
+                bounds.append(boundary + 1)
+            bounds.append(size)
+        return [(start, end - start) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+    # Split Decompressed Value Changes into Chunks
+    def _decompressed_chunks(self, offset, chunk_bytes):
+        with self._open(offset) as stream:
+            tail = b''
+            while True:
+                data = stream.read(chunk_bytes)
+                if not data:
+                    break
+                data = tail + data
+                boundary = data.rfind(b'\n#') + 1
+                if boundary:
+                    yield data[:boundary]
+                tail = data[boundary:]
+            if tail:
+                yield tail
+
+    # Read Value Changes in Parallel
+    def _read_value_changes_parallel(self, start_time, end_time, jobs, offset):
+        """Parses time-aligned chunks in worker processes and merges them in time order.
+
+        At most 2 * jobs chunks are in flight, which bounds memory when the chunks of a
+        compressed file are handed over as bytes.
+        """
+
+        selected_ids = self.selected_ids if self.selected_ids is not None else set(self.data)
+        chunks = self._value_change_chunks(offset)
+        first_time = True
 
-                # Handle value change for a more than one bit signal
-                elif line0 in self._VECTOR_VALUE_CHANGE:
-                    handle_vector_value_change(line)
-                # Handle value change for a single bit signal
-                elif line0 in self._VALUE:
-                    handle_value_change(line)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_chunk_worker,
+                                 initargs=(self.vcd_path, selected_ids, start_time, end_time)) as executor, \
+             tqdm(total=self._remaining(offset), desc="Reading VCD", unit="B", unit_scale=True) as pbar:
+
+            # Chunk results in file order, keeping at most 2 * jobs chunks submitted
+            def results():
+                pending = deque()
+                for chunk in chunks:
+                    length = chunk[1] if isinstance(chunk, tuple) else len(chunk)
+                    pending.append((length, executor.submit(_read_value_change_chunk, chunk)))
+                    if len(pending) > 2 * jobs:
+                        length, future = pending.popleft()
+                        yield length, future.result()
+                while pending:
+                    length, future = pending.popleft()
+                    yield length, future.result()
+
+            for length, (data, begintime, endtime, stats) in results():
+                pbar.update(length)
+                for name, value in stats.items():
+                    self.stats[name] += value
+                if begintime is not None:
+                    if first_time:
+                        self.begintime = begintime
+                        first_time = False
+                    self.endtime = endtime
 
-    # Calculate Hamming Distance
-    def hamming_distance(self, val1, val2):
-        return bin(int(val1, 2) ^ int(val2, 2)).count('1')
+                # Append the chunk history and carry its last value over the seam
+                for identifier_code, chunk_signal in data.items():
+                    if not chunk_signal.tv:
+                        continue
+                    self.data[identifier_code].tv.extend(chunk_signal.tv)
+                    self.cur_sig_vals[identifier_code] = chunk_signal.tv[-1][1]
 
     # Add Value Identifier Code
     def _add_value_identifier_code(self, time, value, identifier_code):
-        entry = self.data[identifier_code]
-        entry.tv.append((time, value))
-        if args.hamming_distance and identifier_code in self.cur_sig_vals and self.cur_sig_vals[identifier_code] != 'x':
-            hd = self.hamming_distance(self.cur_sig_vals[identifier_code], value)
-            entry.hamming_distance.append((time, hd))
+        self.data[identifier_code].tv.append(time, value)
         self.cur_sig_vals[identifier_code] = value
 
+    # Sample Signals
+    def sample(self, references, times):
+        """Returns the values of each of the given signals at the given times, as a dict by reference."""
+
+        times = list(times)
+        return {reference: self[reference].sample(times) for reference in references}
+
     # Get Item
     def __getitem__(self, refname):
         if isinstance(refname, _RE_TYPE):
-            l = []
-            for aSignal in self.signals:
-                if refname.search(aSignal):
-                    l.append(aSignal)
-            for aScope in self.scopes:
-                if refname.search(aScope):
-                    l.append(aScope)
+            l = self.query(refname)
+            # Only selected signals once a selection is made
+            if self.selected_ids is not None:
+                l = [name for name in l if name in self.scopes or self.references_to_ids[name] in self.selected_ids]
             if len(l) == 1:
                 return self[l[0]]
             return l
@@ -251,103 +1444,208 @@ class VCDPARSE(object):
     def get_timescale(self):
         return self.timescale
 
+# Parallel Value Change Workers
+_chunk_worker_state = {}
+
+def _init_chunk_worker(vcd_path, selected_ids, start_time, end_time):
+    _chunk_worker_state.update(vcd_path=vcd_path, selected_ids=selected_ids, start_time=start_time, end_time=end_time)
+
+def _read_value_change_chunk(chunk):
+    """Parses one (offset, length) byte range, or decompressed bytes, into fresh per-identifier histories (no carried-over state)."""
+    state = _chunk_worker_state
+    parser = VCDPARSE(vcd_path=state["vcd_path"])
+    parser.data = {identifier_code: Signal(None, None, identifier_code) for identifier_code in state["selected_ids"]}
+    parser.begintime = parser.endtime = None
+
+    if isinstance(chunk, bytes):
+        parser._read_value_change_section(io.BytesIO(chunk), None, state["start_time"], state["end_time"])
+    else:
+        offset, length = chunk
+        with parser._open(offset) as mm:
+            parser._read_value_change_section(mm, offset + length, state["start_time"], state["end_time"])
+
+    data = {identifier_code: signal for identifier_code, signal in parser.data.items() if signal.tv}
+    return data, parser.begintime, parser.endtime, parser.stats
+
 ##### Monitor Signals
-def monitor_signals(vcd, filtered_signals,enable):
+# Build the combined enable condition
+def enable_condition(mode, count):
+    """
+    Returns a function mapping the active flags of the enable signals to the combined enable state.
 
-    enable_data_dict = {}
+    mode is "any", "all", or a boolean expression over e0, e1, ... (the enable signals in the
+    order given), e.g. "e0 and not e1".
+    """
+    if mode == "any":
+        return any
+    if mode == "all":
+        return all
+    names = [f"e{k}" for k in range(count)]
+    try:
+        code = compile(mode, "<enable_mode>", "eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid enable expression '{mode}': {e.msg}")
+    unknown = set(code.co_names) - set(names)
+    if unknown:
+        raise ValueError(f"Invalid enable expression '{mode}': unknown names {', '.join(sorted(unknown))} (use {', '.join(names)}).")
+    return lambda active: bool(eval(code, {"__builtins__": {}}, dict(zip(names, active))))
+
+# Find the time windows in which the combined enable is active
+def find_enable_windows(vcd, enable, enable_mode="any"):
+    """
+    Event-driven enable window detection.
+
+    Walks the merged change events of the enable signals only, so the cost is O(enable
+    transitions) instead of O(simulation time). An enable signal is active when its value is
+    1 (zero-extended to its size), inactive when 0, and keeps its state on anything else.
 
-    # Populate enable data only if enable signals are provided
+    Returns:
+        list: (start, end) tuples, end being the last time unit the enable is active.
+    """
+    condition = enable_condition(enable_mode, len(enable))
+    begin_time, end_time = vcd.get_begintime(), vcd.get_endtime()
+    ones = ["1".zfill(int(vcd[en].size)) for en in enable]
+    zeros = ["0".zfill(int(vcd[en].size)) for en in enable]
+
+    def enable_events(rank, en):
+        return ((time, rank, value) for time, value in vcd[en].tv if begin_time <= time <= end_time)
+
+    active = [False] * len(enable)
+    windows = []
+    start_time = None
+    events = heapq.merge(*(enable_events(rank, en) for rank, en in enumerate(enable)), key=itemgetter(0))
+    for time, changes in groupby(events, key=itemgetter(0)):
+        for _, rank, value in changes:
+            if value == ones[rank]:
+                active[rank] = True
+            elif value == zeros[rank]:
+                active[rank] = False
+        if condition(active):
+            if start_time is None:  # Enable just became active
+                start_time = time
+        elif start_time is not None:  # Enable just became inactive
+            windows.append((start_time, time - 1))
+            start_time = None
+    # If enable remained active till the end
+    if start_time is not None:
+        windows.append((start_time, end_time))
+    return windows
+
+# Find the monitored time windows, one per output group
+def find_monitor_windows(vcd, enable, enable_mode="any"):
     if enable:
-        for en_signal in enable:
-            enable_data = vcd[en_signal].tv
-            enable_data_dict.update({time: value for time, value in enable_data})
+        return find_enable_windows(vcd, enable, enable_mode)
+    return [(vcd.get_begintime(), vcd.get_endtime())]
 
-    def get_enable_value(enable_data, time):
-        return enable_data.get(time, 'x')  # Default to x if time is not found
+def monitor_signals(vcd, filtered_signals, enable, enable_mode="any"):
 
-    if enable:
-        start_vcd_time = vcd.get_begintime()
-        end_vcd_time = vcd.get_endtime()
-        prv_enable_status = '0'
-        enable_signal_ranges = []
-        start_time = None
-
-        for time in range(start_vcd_time, end_vcd_time + 1):
-            enable_value = get_enable_value(enable_data_dict, time)
-            if any(enable_value == "1".zfill(int(vcd[en].size)) for en in enable):  # Check each enable signal
-                if prv_enable_status == '0':  # Enable just became active
-                    start_time = time
-                    prv_enable_status = '1'
-            elif any(enable_value == "0".zfill(int(vcd[en].size)) for en in enable):  # Check each enable signal
-                if prv_enable_status == '1' and start_time is not None:  # Enable just became inactive
-                    enable_signal_ranges.append((start_time, time - 1))
-                    start_time = None
-                prv_enable_status = '0'
-            else:  # Default to the previous enable status
-                prv_enable_status = prv_enable_status
-        # If enable remained active till the end
-        if prv_enable_status == '1' and start_time is not None:
-            enable_signal_ranges.append((start_time, end_vcd_time))
-    else:
-        enable_signal_ranges = [(vcd.get_begintime(), vcd.get_endtime())]
+    enable_signal_ranges = find_monitor_windows(vcd, enable, enable_mode)
+
+    # Sorted window bounds; windows don't overlap, so each change belongs to at most one
+    window_starts = [start for start, _ in enable_signal_ranges]
+    window_ends = [end for _, end in enable_signal_ranges]
+    group_ids = range(1, len(enable_signal_ranges) + 1)
 
-    # Group signals based on time windows
-    grouped_time_windows = {group_id: {"start": start, "end": end} for group_id, (start, end) in enumerate(enable_signal_ranges, start=1)}
+    # Initial value of enable signals before each group
+    enable_initial = [(None, "0".zfill(int(vcd[en].size))) for en in reversed(enable)]
 
     # Initialize monitored data groups
-    monitored_data_groups = {group_id: {signal: [] for signal in filtered_signals} for group_id in grouped_time_windows}
-    
-    # To track the last value of each signal for each group
-    last_values = {signal: None for signal in filtered_signals}
+    monitored_data_groups = {group_id: {} for group_id in group_ids}
 
     # Monitor signals based on time windows
     for signal in tqdm(filtered_signals, total=len(filtered_signals), desc="Monitoring Defined Signals", unit=" signals"):
-        sig_data = vcd[signal].tv  # Time-value pairs for the signal
-        # Assign values to their respective groups based on time
-        for time, value in sig_data:
-            for group_id, window in grouped_time_windows.items():
-                if window["start"] <= time <= window["end"]:  # Check if time is in the group window
-                    monitored_data_groups[group_id][signal].append((time, value))
-                    last_values[signal] = value
-                    break  # Stop checking once the group is found
-    
-    # Fill in missing values with the last known value
-    for group_id, group_data in monitored_data_groups.items():
-        for signal, data in group_data.items():
-            filled_data = []
-            last_value = None
-            for time, value in data:
-                if value is None and last_value is not None:
-                    filled_data.append((time, last_value))  # Use the last known value
-                else:
-                    filled_data.append((time, value))
-                    last_value = value
+        tv = vcd[signal].tv  # Time-value pairs for the signal
+        times = tv.times
+        is_enable = signal in enable
+        lo = 0
+        for group_id, start_time, end_time in zip(group_ids, window_starts, window_ends):
+            # Changes inside the window and the last change before it, found by bisection
+            lo = bisect.bisect_left(times, start_time, lo)
+            hi = bisect.bisect_right(times, end_time, lo)
+            filled_data = tv[lo:hi]
 
             # Add initial value before the group
-            start_time = grouped_time_windows[group_id]["start"]
-            if signal in enable:  # Special case for trigger (enable) signal
-                for en in enable:
-                    filled_data.insert(0, (start_time - 1, "0".zfill(int(vcd[en].size))))
-            else:
-                previous_value = None
-                for time, value in vcd[signal].tv:
-                    if time < start_time:
-                        previous_value = value
-                    else:
-                        break
-                if previous_value is not None:
-                    filled_data.insert(0, (start_time - 1, previous_value))
+            if is_enable:  # Special case for trigger (enable) signal
+                filled_data[0:0] = [(start_time - 1, value) for _, value in enable_initial]
+            elif lo > 0:
+                filled_data.insert(0, (start_time - 1, tv[lo - 1][1]))
 
             # Extend last value after the group
-            end_time = grouped_time_windows[group_id]["end"]
-            if last_value is not None:
-                filled_data.append((end_time + 1, last_value))
+            if hi > lo:
+                filled_data.append((end_time + 1, tv[hi - 1][1]))
 
-            # Update the group data
-            group_data[signal] = filled_data
+            monitored_data_groups[group_id][signal] = filled_data
+            lo = hi
 
     return monitored_data_groups
 
+##### Clock Cycles
+# Boundaries of fixed-period clock cycles covering [start_time, end_time]
+def periodic_cycle_times(start_time, end_time, period):
+    num_cycles = math.ceil((end_time - start_time) / period)
+    return range(start_time, start_time + num_cycles * period + 1, period)
+
+# Times of the edges of a one-bit clock signal
+def clock_edge_times(signal, edge="rising"):
+    """
+    Returns the times of the rising (0 to 1), falling (1 to 0) or both edges of a one-bit
+    signal as an array. Changes to or from x/z are not edges. The codes of the columnar
+    history are compared directly, without decoding any value.
+    """
+    tv = signal.tv
+    low, high = tv._encode('0'), tv._encode('1')
+    edges = {"rising": {(low, high)}, "falling": {(high, low)}, "both": {(low, high), (high, low)}}[edge]
+    codes = tv.codes
+    return array('q', compress(islice(tv.times, 1, None), [pair in edges for pair in zip(codes, islice(codes, 1, None))]))
+
+# Boundaries of the clock cycles, None without a clock
+def cycle_boundaries(vcd, clock=None, clock_signal=None, clock_edge="rising", time=None):
+    """
+    Returns the edge index the monitored data is cut at: cycle k runs from times[k] to
+    times[k + 1]. With clock_signal, the cycles run between consecutive edges of that signal
+    inside the time window, so gated clocks and frequency changes give cycles of the actual
+    length. With a clock period, the cycles are periodic from the start of the window.
+    """
+    start_time, end_time = time if time else (vcd.get_begintime(), vcd.get_endtime())
+    if clock_signal:
+        edges = clock_edge_times(vcd[clock_signal], clock_edge)
+        return edges[bisect.bisect_left(edges, start_time):bisect.bisect_right(edges, end_time)]
+    if clock:
+        return periodic_cycle_times(start_time, end_time, clock)
+    return None
+
+# Indices of the cycles that overlap a monitored window
+def window_cycles(cycle_times, start_time, end_time):
+    """
+    Returns the range of the cycles k whose span [cycle_times[k], cycle_times[k + 1])
+    overlaps the window [start_time, end_time], found by bisection.
+    """
+    num_cycles = max(len(cycle_times) - 1, 0)
+    lo = max(bisect.bisect_right(cycle_times, start_time) - 1, 0)
+    hi = min(bisect.bisect_right(cycle_times, end_time), num_cycles)
+    return range(lo, max(lo, hi))
+
+# Flags of the cycles in which any of the signals changes
+def active_cycles(vcd, signals, cycle_times):
+    """
+    Returns a bytearray holding 1 for every cycle [cycle_times[k], cycle_times[k + 1]) in
+    which at least one of the signals has a value change. Each history is bisected once per
+    cycle it is active in, not once per change.
+    """
+    num_cycles = max(len(cycle_times) - 1, 0)
+    active = bytearray(num_cycles)
+    if not num_cycles:
+        return active
+    first_time, last_time = cycle_times[0], cycle_times[-1]
+    for signal in signals:
+        times = vcd[signal].tv.times
+        i = bisect.bisect_left(times, first_time)
+        while i < len(times) and times[i] < last_time:
+            k = bisect.bisect_right(cycle_times, times[i]) - 1
+            active[k] = 1
+            i = bisect.bisect_left(times, cycle_times[k + 1], i)
+    return active
+
 ##### Write Output Files
 # Build Scope Hierarchy
 def build_scope_hierarchy(vcd):
@@ -362,20 +1660,28 @@ def build_scope_hierarchy(vcd):
         current_scope[parts[-1]] = signal  # Final part is the signal itself
     return all_scopes
 # Generate Identifier
-def generate_identifier():
-    # Ensure the first character is a letter (to avoid starting with a number)
-    first_char = random.choice(string.ascii_uppercase)
-    # Generate the remaining 5 characters from uppercase letters and digits
-    remaining_chars = ''.join(random.choices(string.ascii_uppercase + string.digits, k=5))
-    return first_char + remaining_chars
-# Write Scopes
-identifiers = {}
-sizes = {}
-def write_scopes(scopes_output, scopes, indent=""):
+def generate_identifier(index):
+    """
+    Returns the index-th VCD identifier code, shortest first: '!' to '~' (the 94 printable
+    ASCII characters), then '!!', '"!', ... so distinct indices never collide.
+    """
+    identifier = []
+    index += 1
+    while index:
+        index, digit = divmod(index - 1, 94)
+        identifier.append(chr(33 + digit))
+    return ''.join(identifier)
+# Assign identifiers to the most frequently changing signals first
+def assign_identifiers_by_toggles(vcd, identifiers):
+    identifiers.clear()
+    for signal in sorted(vcd.get_signals(), key=lambda signal: -len(vcd[signal].tv)):
+        identifiers[signal] = generate_identifier(len(identifiers))
+# Write Scopes, filling the identifier and size of each signal
+def write_scopes(scopes_output, scopes, identifiers, sizes, indent=""):
     for name, content in scopes.items():
         if isinstance(content, dict):
             scopes_output.append(f"{indent}$scope module {name} $end\n")
-            write_scopes(scopes_output, content, indent + "  ")
+            write_scopes(scopes_output, content, identifiers, sizes, indent + "  ")
             scopes_output.append(f"{indent}$upscope $end\n")
         else:
             match = re.search(r'\[(\d+):(\d+)\]', name)
@@ -390,7 +1696,7 @@ def write_scopes(scopes_output, scopes, indent=""):
             signal_name  = scopes[name]
             sizes[signal_name] = size
             if signal_name not in identifiers:
-                identifiers[signal_name] = generate_identifier()
+                identifiers[signal_name] = generate_identifier(len(identifiers))
             corrected_name = re.sub(r'\[(\d+):(\d+)\]', r' [\1:\2]', name)
             identifier = identifiers[signal_name]
             if size < 10:
@@ -400,7 +1706,7 @@ def write_scopes(scopes_output, scopes, indent=""):
             else:
                 scopes_output.append(f"{indent}$var wire {size} {identifier} {corrected_name} $end\n")
 # Generate VCD Header
-def generate_vcd_header(vcd):
+def generate_vcd_header(vcd, identifiers, sizes):
     header = []
     
     # Add version and timescale
@@ -412,7 +1718,7 @@ def generate_vcd_header(vcd):
     
     # Capture scopes in the header
     scopes_output = []
-    write_scopes(scopes_output, all_scopes)  # Modified write_scopes to take a list
+    write_scopes(scopes_output, all_scopes, identifiers, sizes)  # Modified write_scopes to take a list
     
     # Add scope outputs to the header
     header.extend(scopes_output)
@@ -423,106 +1729,137 @@ def generate_vcd_header(vcd):
     # Convert list to a string for easy printing
     return ''.join(header)
 # Generate VCD Files for each clock cycle
-def generate_vcd_files_with_groups(start_time, num_cycles, monitored_data_groups, output_folder):
+def generate_vcd_files_with_groups(vcd, cycle_times, monitored_data_groups, output_folder,
+                                   archive=False, converter=None, identifiers=None, active=None, windows=None):
     """
     Generate VCD files for each group, creating a folder for each group and files for each clock cycle.
 
+    Each cycle file holds the value of every signal at the start of the cycle, every change
+    inside the cycle, and the value of every signal at its end. One cursor per signal walks
+    its sorted history, so the cost is O(written cycles * signals + changes). Skipped cycles
+    cost nothing: the cursors catch up at the next written cycle. The header and the
+    per-signal line pieces are built once, and each cycle file is assembled in memory and
+    written with a single call. Files are named cycle_<time>.vcd, prefixed with group_<id>_
+    when there are several groups, like the files of generate_native_saif_files. With windows,
+    each group only gets the cycles that overlap its window.
+
     Args:
-        start_time (int): Starting time for the cycles.
-        num_cycles (int): Number of cycles to generate VCD files for.
+        vcd (VCDPARSE): Parser with the monitored signals.
+        cycle_times (sequence): Cycle boundaries, cycle k runs from cycle_times[k] to cycle_times[k + 1].
         monitored_data_groups (dict): Dictionary of monitored data, structured by groups.
         output_folder (str): Root folder to save the output files.
+        archive (bool): Pack the cycle files into output_folder/cycles.zip instead of writing one file each
+            (no SAIF conversion then, vcd2saif needs the files).
+        converter (SaifConverter): Converts each cycle file to SAIF if given, closed when done.
+        identifiers (dict): Identifier code of each signal, completed in scope order.
+        active (bytearray): Flag of each cycle, as returned by active_cycles; only flagged cycles are
+            written. All cycles are written when None.
+        windows (list): (start, end) window of each group, as found by find_monitor_windows. Every
+            group gets all cycles when None.
     """
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
     # Step 1: Generate identical VCD header 
-    vcd_header = generate_vcd_header(vcd)  
+    identifiers = {} if identifiers is None else identifiers
+    sizes = {}
+    vcd_header = generate_vcd_header(vcd, identifiers, sizes)
 
     start_cycle_time = time_module.time()
-    clock_period = args.clock if args.clock else 2
+    cycle_archive = zipfile.ZipFile(os.path.join(output_folder, "cycles.zip"), 'w', zipfile.ZIP_STORED, allowZip64=True) if archive else None
 
     # Step 2: Process each group and create a folder for it
-    for group_id, group_data in monitored_data_groups.items():
+    for group_number, (group_id, group_data) in enumerate(monitored_data_groups.items()):
 
         # Create a folder for each group
         if not os.path.exists(output_folder):
             os.makedirs(output_folder)
-
-        # Initialize last known value for each signal in the group
-        last_value = {signal: '0' * sizes[signal] for signal in group_data}
-
-        # Step 3: Generate VCD files for each cycle within the group
-        for cycle in range(num_cycles):
-            cycle_time = start_time + cycle * clock_period
-            vcd_file_path = os.path.join(output_folder, f"cycle_{cycle_time}.vcd")
-            with open(vcd_file_path, 'w') as f:
-                f.write(vcd_header)
-
-                f.write(f"#{cycle_time}\n")  # Start of the cycle
-
-                for signal, data in group_data.items():
-                    identifier = identifiers[signal]
-                    current_value = last_value[signal]
-                    for t, value in data:
-                        if t == cycle_time:
-                            current_value = value if 'x' not in value else last_value[signal]
-                            break
-
-                    last_value[signal] = current_value 
-                    size = sizes[signal]
-                    if size == 1:
-                        f.write(f"{current_value}{identifier}\n")
-                    else:
-                        f.write(f"b{current_value} {identifier}\n")
-
-                f.write(f"#{cycle_time+1}\n")  
-
-                for signal, data in group_data.items():
-                    identifier = identifiers[signal]
-                    current_value = last_value[signal]
-                    for t, value in data:
-                        if t == (cycle_time+1):
-                            current_value = value if 'x' not in value else last_value[signal]
-                            break
-                    last_value[signal] = current_value 
-                    size = sizes[signal]
-                    if size == 1:
-                        f.write(f"{current_value}{identifier}\n")
-                    else:
-                        f.write(f"b{current_value} {identifier}\n")
-
-                f.write(f"#{cycle_time+2}\n") 
-
-                for signal, data in group_data.items():
-                    identifier = identifiers[signal]
-                    current_value = last_value[signal]
-                    size = sizes[signal]
-                    if size == 1:
-                        f.write(f"{current_value}{identifier}\n")
-                    else:
-                        f.write(f"b{current_value} {identifier}\n")
-
-                f.write("$end\n")
+        prefix = f"group_{group_id}_" if len(monitored_data_groups) > 1 else ""
+
+        signals = list(group_data)
+        histories = [group_data[signal] for signal in signals]
+
+        # Value line of signal k is prefixes[k] + value + suffixes[k]
+        prefixes = ["" if sizes[signal] == 1 else "b" for signal in signals]
+        suffixes = [f"{identifiers[signal]}\n" if sizes[signal] == 1 else f" {identifiers[signal]}\n" for signal in signals]
+
+        # One cursor per signal into its sorted history, and its last known value
+        cursors = [0] * len(signals)
+        last_value = ['0' * sizes[signal] for signal in signals]
+
+        # Step 3: Generate VCD files for each cycle within the group window
+        cycles = range(len(cycle_times) - 1) if windows is None else window_cycles(cycle_times, *windows[group_number])
+        for cycle in cycles:
+            if active is not None and not active[cycle]:
+                continue
+            cycle_time, next_cycle_time = cycle_times[cycle], cycle_times[cycle + 1]
+
+            # Advance every cursor through this cycle; x values keep the last known value
+            changes = []
+            for k, data in enumerate(histories):
+                i = cursors[k]
+                end = len(data)
+                while i < end and data[i][0] <= cycle_time:
+                    if 'x' not in data[i][1]:
+                        last_value[k] = data[i][1]
+                    i += 1
+                while i < end and data[i][0] < next_cycle_time:
+                    if 'x' not in data[i][1]:
+                        changes.append((data[i][0], k, data[i][1]))
+                    i += 1
+                cursors[k] = i
+
+            # Start of the cycle: value of every signal
+            parts = [vcd_header, f"#{cycle_time}\n"]
+            parts.extend(chain.from_iterable(zip(prefixes, last_value, suffixes)))
+
+            # Every change inside the cycle, in time order
+            changes.sort(key=itemgetter(0, 1))
+            for t, changes_at_t in groupby(changes, key=itemgetter(0)):
+                parts.append(f"#{t}\n")
+                for _, k, value in changes_at_t:
+                    last_value[k] = value
+                    parts.append(prefixes[k] + value + suffixes[k])
+
+            # End of the cycle: value of every signal
+            parts.append(f"#{next_cycle_time}\n")
+            parts.extend(chain.from_iterable(zip(prefixes, last_value, suffixes)))
+            parts.append("$end\n")
+
+            name = f"{prefix}cycle_{cycle_time}"
+            vcd_file_path = os.path.join(output_folder, name + ".vcd")
+            if cycle_archive is not None:
+                cycle_archive.writestr(name + ".vcd", ''.join(parts))
+            else:
+                with open(vcd_file_path, 'w') as f:
+                    f.write(''.join(parts))
 
             # Step 4: Optionally generate SAIF files
-            saif_file_path = os.path.join(output_folder, f"cycle_{cycle_time}.saif")
-            os.system(f"vcd2saif -input {vcd_file_path} -output {saif_file_path} >> log_vcd2saif_converter.log")
-
-            # Remove VCD file if specified
-            if args.remove_vcd_files:
-                while not os.path.exists(saif_file_path):
-                    time_module.sleep(1)  # Wait for the conversion to complete
-                os.remove(vcd_file_path)
+            if converter is not None:
+                converter.submit(vcd_file_path, os.path.join(output_folder, name + ".saif"))
 
+    if cycle_archive is not None:
+        cycle_archive.close()
+    if converter is not None:
+        converter.close()
     print(f"VCD files generated for all groups in {time_module.time() - start_cycle_time:.2f} seconds.")
 # Generate VCD Files for each monitored data group
-def generate_one_vcd_file_monitored_data(monitored_data_groups, output_folder):
+def generate_one_vcd_file_monitored_data(vcd, monitored_data_groups, output_folder, converter=None, identifiers=None, buffer_lines=1 << 16):
+    """
+    Writes one VCD file per monitored data group.
+
+    The per-signal histories are already sorted, so they are merged in time order with
+    heapq.merge instead of being collected and sorted as a whole; ties keep the signal order.
+    Each timestamp is written once before all of its changes, and lines are written in
+    batches of buffer_lines. Each file is converted to SAIF by converter if given, which is
+    closed when done; identifiers are completed in scope order.
+    """
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
     # Step 1: Create identical header for all VCD files
-    vcd_header = generate_vcd_header(vcd)
+    identifiers = {} if identifiers is None else identifiers
+    vcd_header = generate_vcd_header(vcd, identifiers, {})
 
     start_generate_time = time_module.time()
 
@@ -531,61 +1868,921 @@ def generate_one_vcd_file_monitored_data(monitored_data_groups, output_folder):
 
         vcd_file_path = os.path.join(output_folder, f"monitored_data_group_{group_id}.vcd")
 
+        # One ((time, value), identifier) stream per signal
+        streams = []
+        for signal_name, time_value_pairs in group_data.items():
+            identifier = identifiers.get(signal_name)
+            if not identifier:
+                print(f"Warning: No identifier found for signal {signal_name}. Skipping.")
+                continue
+            streams.append(zip(time_value_pairs, repeat(identifier)))
+
         with open(vcd_file_path, 'w') as f:
             f.write(vcd_header)
 
-             # Collect all (time, signal_name, value) tuples
-            all_changes = []
-            for signal_name, time_value_pairs in group_data.items():
-                identifier = identifiers.get(signal_name)
-                if not identifier:
-                    print(f"Warning: No identifier found for signal {signal_name}. Skipping.")
-                    continue
+            # Write changes in time order, each timestamp once
+            parts = []
+            last_time = None
+            for (time, value), identifier in heapq.merge(*streams, key=lambda change: change[0][0]):
+                if time != last_time:
+                    parts.append(f"#{time}\n")
+                    last_time = time
+                if len(value) == 1:
+                    parts.append(f"{value}{identifier}\n")
+                else:
+                    parts.append(f"b{value} {identifier}\n")
+                if len(parts) >= buffer_lines:
+                    f.write(''.join(parts))
+                    parts.clear()
+            parts.append("$end\n")
+            f.write(''.join(parts))
 
-                for time, value in time_value_pairs:
-                    all_changes.append((time, signal_name, value, identifier))
+        # Optional SAIF generation
+        if converter is not None:
+            converter.submit(vcd_file_path, os.path.join(output_folder, f"monitored_data_group_{group_id}.saif"))
 
-            # Sort all changes by time
-            all_changes.sort(key=lambda x: x[0])
+    if converter is not None:
+        converter.close()
+    print(f"All monitored data groups written to VCD files in {time_module.time() - start_generate_time:.2f} seconds.")
 
-            # Write changes in sorted order
-            for time, signal_name, value, identifier in all_changes:
-                f.write(f"#{time}\n")
-                if len(value) == 1:
-                    f.write(f"{value}{identifier}\n")
-                else:
-                    f.write(f"b{value} {identifier}\n")
+# Stream monitored data groups straight into VCD files
+def stream_monitored_data(vcd, filtered_signals, enable, output_folder, start_time=None, end_time=None, enable_mode="any",
+                          converter=None, identifiers=None):
+    """
+    Streaming equivalent of monitor_signals followed by generate_one_vcd_file_monitored_data.
 
-            f.write("$end\n")
+    Value changes flow in time order from VCDPARSE.iter_value_changes through the enable
+    window detection into the group VCD files, so memory is bounded by the number of signals
+    instead of the length of the simulation. The files written are identical.
+
+    Args:
+        vcd (VCDPARSE): Parser with definitions read and signals selected.
+        filtered_signals (list): Signals to write, in output order.
+        enable (list): Enable signals; one group is written per enable window. Empty for one group.
+        output_folder (str): Folder to save the output files.
+        start_time (int): Optional start time of monitoring.
+        end_time (int): Optional end time of monitoring.
+        enable_mode (str): How enable signals combine, see enable_condition.
+        converter (SaifConverter): Converts each group file to SAIF if given, closed when done.
+        identifiers (dict): Identifier code of each signal, completed in scope order.
+    """
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    identifiers = {} if identifiers is None else identifiers
+    vcd_header = generate_vcd_header(vcd, identifiers, {})
+    start_generate_time = time_module.time()
+
+    # Output lines per signal, and signal indices per identifier code (aliases share a code)
+    signal_ids = {}
+    formats = []
+    for index, signal in enumerate(filtered_signals):
+        signal_ids.setdefault(vcd.references_to_ids[signal], []).append(index)
+        formats.append((identifiers[signal], signal in enable))
+
+    # Value change line, preceded by the timestamp when it differs from the last one written
+    def format_change(time, index, value):
+        identifier = formats[index][0]
+        line = f"{value}{identifier}\n" if len(value) == 1 else f"b{value} {identifier}\n"
+        if time == group["time"]:
+            return line
+        group["time"] = time
+        return f"#{time}\n" + line
+
+    # Positions of each enable identifier code in the enable list
+    enable_ranks = {}
+    for rank, en in enumerate(enable):
+        enable_ranks.setdefault(vcd.references_to_ids[en], []).append(rank)
+    enable_ones = ["1".zfill(int(vcd[en].size)) for en in enable]
+    enable_zeros = ["0".zfill(int(vcd[en].size)) for en in enable]
+    condition = enable_condition(enable_mode, len(enable))
+    enable_active = [False] * len(enable)
+
+    state = [None] * len(filtered_signals)  # Last value of each signal
+    window = {}  # Last in-window value of each signal that changed in the open window
+    group = {"id": 0, "file": None, "path": None, "time": None}
+
+    def open_window(time):
+        group["id"] += 1
+        group["path"] = os.path.join(output_folder, f"monitored_data_group_{group['id']}.vcd")
+        group["file"] = f = open(group["path"], 'w')
+        group["time"] = None
+        f.write(vcd_header)
+        # Initial value before the group
+        for index, (_, is_enable) in enumerate(formats):
+            if is_enable:
+                for zero in reversed(enable_zeros):
+                    f.write(format_change(time - 1, index, zero))
+            elif state[index] is not None:
+                f.write(format_change(time - 1, index, state[index]))
+
+    def close_window(time):
+        f = group["file"]
+        # Extend last value after the group
+        for index in sorted(window):
+            f.write(format_change(time + 1, index, window[index]))
+        f.write("$end\n")
+        f.close()
+        group["file"] = None
+        window.clear()
 
         # Optional SAIF generation
-        if args.generate_saif_files:
-            saif_file_path = os.path.join(output_folder, f"monitored_data_group_{group_id}.saif")
-            os.system(f"vcd2saif -input {vcd_file_path} -output {saif_file_path} >> saif.log")
+        if converter is not None:
+            converter.submit(group["path"], os.path.join(output_folder, f"monitored_data_group_{group['id']}.saif"))
+
+    window_active = False
+    for time, changes in vcd.iter_value_changes(start_time, end_time):
+        in_range = start_time is None or time >= start_time
+
+        if in_range and not enable and group["id"] == 0:
+            open_window(vcd.get_begintime())
+
+        # Enable window detection, see find_enable_windows
+        if in_range and enable:
+            enable_changed = False
+            for identifier_code, value in changes:
+                for rank in enable_ranks.get(identifier_code, ()):
+                    enable_changed = True
+                    if value == enable_ones[rank]:
+                        enable_active[rank] = True
+                    elif value == enable_zeros[rank]:
+                        enable_active[rank] = False
+            if enable_changed:
+                if condition(enable_active):
+                    if not window_active:
+                        open_window(time)
+                        window_active = True
+                elif window_active:
+                    close_window(time - 1)
+                    window_active = False
+
+        # Route the block: sorted by signal order, stable within a signal
+        routed = []
+        for identifier_code, value in changes:
+            for index in signal_ids.get(identifier_code, ()):
+                routed.append((index, value))
+        routed.sort(key=lambda change: change[0])
+        if in_range and group["file"] is not None:
+            f = group["file"]
+            for index, value in routed:
+                f.write(format_change(time, index, value))
+                window[index] = value
+        for index, value in routed:
+            state[index] = value
+
+    # Close the window still open at the end
+    if not enable and group["id"] == 0:
+        open_window(vcd.get_begintime())
+    if group["file"] is not None:
+        close_window(vcd.get_endtime())
+
+    if converter is not None:
+        converter.close()
+    print(f"All monitored data groups streamed to VCD files in {time_module.time() - start_generate_time:.2f} seconds.")
+
+##### Hamming Distance
+_BIT_ONES = str.maketrans('01xz', '0100')
+_BIT_XS = str.maketrans('01xz', '0010')
+_BIT_ZS = str.maketrans('01xz', '0001')
+
+# Number of set bits of a non-negative integer; int.bit_count only exists from Python 3.10
+if hasattr(int, 'bit_count'):
+    popcount = int.bit_count
+else:
+    def popcount(value):
+        return bin(value).count('1')
+
+# Bit masks of the 1, x and z bits of a value, extended to the signal width like VCD does
+def value_masks(value, width):
+    try:
+        return int(value, 2), 0, 0
+    except ValueError:
+        pass
+    value = value.lower()
+    if value.strip('01xz'):
+        value = re.sub(r'[^01xz]', 'x', value)
+    if len(value) < width:
+        value = value.rjust(width, value[0] if value[0] in 'xz' else '0')
+    value = value[-width:]
+    return int(value.translate(_BIT_ONES), 2), int(value.translate(_BIT_XS), 2), int(value.translate(_BIT_ZS), 2)
+
+# Bit-sliced population counts of a list of masks
+def bit_planes(masks):
+    """
+    Returns planes such that bit b of planes[j] is bit j of the number of masks with bit b set.
+
+    The masks are reduced with carry-save adders applied column-wise over the whole list,
+    three masks at a time into a sum at the same weight and a carry at the next weight.
+    """
+    planes = []
+    level = list(masks)
+    while level:
+        carries = []
+        while len(level) > 2:
+            third = len(level) // 3
+            a, b, c = level[:third], level[third:2 * third], level[2 * third:3 * third]
+            ab = list(map(xor, a, b))
+            carries.extend(map(or_, map(and_, a, b), map(and_, ab, c)))
+            level = list(map(xor, ab, c)) + level[3 * third:]
+        if len(level) == 2:
+            carries.append(level[0] & level[1])
+            planes.append(level[0] ^ level[1])
+        else:
+            planes.append(level[0])
+        level = carries
+    return planes
 
-            # Optional removal of VCD file
-            if args.remove_vcd_files:
-                while not os.path.exists(saif_file_path):
-                    time_module.sleep(1)  # Wait for SAIF generation to complete
-                os.remove(vcd_file_path)
+class HammingDistance(object):
+    """
+    Hamming distances of one signal history, computed in a batch after parsing.
+
+    Values are compared as 1/x/z bit masks: packed binary codes of the ValueHistory are used
+    as integers directly and interned values are converted once per distinct value. Each change
+    gets the number of bits that flipped between 0 and 1 ("distances") and the number of bits
+    that changed to or from x/z ("unknown"). Changes following a value with no known bit get no
+    entry, as there is nothing to compare against. The comparisons run column-wise over the
+    whole history with map, and per-bit toggle counts come from bit_planes.
+
+    With start_time and end_time, only the changes inside [start_time, end_time] get an entry.
+    The first of them is compared with the last value before start_time, so the result does not
+    depend on how much of the history before the window was parsed.
+    """
 
-    print(f"All monitored data groups written to VCD files in {time_module.time() - start_generate_time:.2f} seconds.")
+    # Initialize the HammingDistance object and scan the history
+    def __init__(self, history, width, initial_value='0', start_time=None, end_time=None):
+        self.width = width
+        self.distances = CountHistory()
+        self.unknown = CountHistory()
+        self._planes = []
+        self._scan(history, initial_value, start_time, end_time)
+
+    # Compare every value with the previous one
+    def _scan(self, history, initial_value, start_time=None, end_time=None):
+        width = self.width
+        lo = 0 if start_time is None else bisect.bisect_left(history.times, start_time)
+        hi = len(history) if end_time is None else bisect.bisect_right(history.times, end_time, lo)
+        codes = history.codes[lo:hi]
+        history_times = history.times[lo:hi]
+        if lo > 0:
+            initial_value = history._decode(history.codes[lo - 1])  # Last value before the window
+        initial = value_masks(initial_value, width)
+
+        # Interned values are mostly wide binary vectors, converted in one go unless some hold x/z
+        try:
+            table_ones = list(map(int, history._table, repeat(2)))
+            table = [(mask, 0, 0) for mask in table_ones] if initial[1] or initial[2] else None
+        except ValueError:
+            table = [value_masks(value, width) for value in history._table]
+            table_ones = [mask[0] for mask in table]
+
+        # Mask columns, starting with the initial value
+        ones = [initial[0]]
+        ones.extend([code >> 6 if code >= 0 else table_ones[~code] for code in codes])
+        if table is not None:
+            xs = [initial[1]]
+            xs.extend([0 if code >= 0 else table[~code][1] for code in codes])
+            zs = [initial[2]]
+            zs.extend([0 if code >= 0 else table[~code][2] for code in codes])
+            unknowns = list(map(or_, xs, zs))
+            changed = list(map(or_, map(or_, map(xor, ones[1:], ones), map(xor, xs[1:], xs)), map(xor, zs[1:], zs)))
+            unknown = list(map(or_, unknowns[1:], unknowns))
+            flips = list(map(and_, changed, map(invert, unknown)))
+            unknown = list(map(and_, changed, unknown))
+            # Nothing to compare against after a value with no known bit
+            full = (1 << width) - 1
+            known = [mask != full for mask in unknowns[:-1]]
+            times = compress(history_times, known)
+            flips = list(compress(flips, known))
+            unknown = compress(unknown, known)
+        else:
+            times = history_times
+            flips = list(map(xor, ones[1:], ones))
+            unknown = repeat(0, len(flips))
+
+        self.distances.times = array('q', times)
+        self.distances.codes = array('q', map(popcount, flips))
+        self.unknown.times = self.distances.times
+        self.unknown.codes = array('q', map(popcount, unknown))
+        self._planes = bit_planes(flips)
+
+    # Total number of 0/1 bit flips
+    def total(self):
+        return sum(self.distances.codes)
+
+    # Total number of bit changes to or from x/z
+    def unknown_total(self):
+        return sum(self.unknown.codes)
+
+    # Number of 0/1 flips of each bit, LSB first
+    def bit_toggles(self):
+        return [sum(((plane >> bit) & 1) << j for j, plane in enumerate(self._planes)) for bit in range(self.width)]
+
+    # Nonzero sums of the distances inside sorted intervals [starts[k], ends[k]], at their starts
+    def _interval_sums(self, starts, ends, last_time):
+        sums = CountHistory()
+        if not len(starts):
+            return sums
+        times, codes = self.distances.times, self.distances.codes
+        lo = bisect.bisect_left(times, starts[0])
+        hi = bisect.bisect_right(times, last_time, lo)
+        # Interval of each distance by bisection; consecutive distances share one
+        keys = map(bisect.bisect_right, repeat(starts), islice(times, lo, hi))
+        for k, entries in groupby(zip(keys, islice(times, lo, hi), islice(codes, lo, hi)), key=itemgetter(0)):
+            total = sum(hd for _, time, hd in entries if ends is None or time <= ends[k - 1])
+            if total:
+                sums.append(starts[k - 1], total)
+        return sums
+
+    # Sums of the distances inside each (start, end) window, bounds included, as a CountHistory
+    # holding the nonzero sums at the window starts
+    def window_sums(self, windows):
+        ends = [end for _, end in windows]
+        return self._interval_sums([start for start, _ in windows], ends, ends[-1] if ends else 0)
+
+    # Sums of the distances inside each clock cycle [cycle_times[k], cycle_times[k + 1]), as a
+    # CountHistory holding the nonzero sums at the cycle start times
+    def cycle_sums(self, cycle_times):
+        if len(cycle_times) < 2:
+            return CountHistory()
+        return self._interval_sums(cycle_times[:-1], None, cycle_times[-1] - 1)
+
+##### Hamming Distance Output
+class HammingWriter(abc.ABC):
+    """
+    Streams per-signal Hamming distances to a file, one signal at a time.
 
-##### Helper Functions
-def validate_instances(input_instances, signals):
+    Subclasses implement one format each; HAMMING_WRITERS maps the --hd-format names to them.
+    Nothing is kept in memory apart from the signal being written.
+    """
+
+    extension = None
+
+    # Initialize the HammingWriter object and open the output file
+    def __init__(self, path_stem):
+        self.path = path_stem + self.extension
+        self.open()
+
+    @abc.abstractmethod
+    def open(self):
+        pass
+
+    # Write the distances of one signal as a CountHistory
+    @abc.abstractmethod
+    def write(self, signal, distances):
+        pass
+
+    @abc.abstractmethod
+    def close(self):
+        pass
+
+class JsonHammingWriter(HammingWriter):
+    """Indented JSON object of signal -> [[time, hd], ...], byte-identical to a json.dump of the whole dict."""
+
+    extension = '.json'
+
+    def open(self):
+        self.f = open(self.path, 'w')
+        self.count = 0
+
+    def write(self, signal, distances):
+        self.write_entry(signal, list(distances))
+
+    # Write any JSON value under the key signal
+    def write_entry(self, signal, value):
+        # Dump each signal as a one-key object and splice it into the enclosing object
+        text = json.dumps({signal: value}, indent=4)
+        self.f.write(("{\n" if self.count == 0 else ",\n") + text[2:-2])
+        self.count += 1
+
+    def close(self):
+        self.f.write("\n}" if self.count else "{}")
+        self.f.close()
+
+class CsvHammingWriter(HammingWriter):
+    """signal,time,hd rows, grouped by signal."""
+
+    extension = '.csv'
+
+    def open(self):
+        self.f = open(self.path, 'w', newline='')
+        self.writer = csv.writer(self.f)
+        self.writer.writerow(("signal", "time", "hd"))
+
+    def write(self, signal, distances):
+        self.writer.writerows(zip(repeat(signal), distances.times, distances.codes))
+
+    def close(self):
+        self.f.close()
+
+class NpzHammingWriter(HammingWriter):
+    """
+    NumPy .npz archive holding times/<signal> and distances/<signal> int64 arrays.
 
-    available_instances = list(set('.'.join(signal.split('.')[:-1]) for signal in signals))
+    The .npy members are written directly (format version 1.0), so numpy.load can read the
+    file but NumPy is not needed to write it.
+    """
+
+    extension = '.npz'
+
+    def open(self):
+        self.archive = zipfile.ZipFile(self.path, 'w', zipfile.ZIP_STORED, allowZip64=True)
+
+    # Write one int64 array as a .npy member
+    def _write_array(self, name, column):
+        descr = ('<' if sys.byteorder == 'little' else '>') + 'i8'
+        header = "{'descr': '%s', 'fortran_order': False, 'shape': (%d,), }" % (descr, len(column))
+        header += ' ' * (63 - (len(header) + 10) % 64) + '\n'
+        with self.archive.open(name + '.npy', 'w', force_zip64=True) as member:
+            member.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1'))
+            member.write(column.tobytes())
+
+    def write(self, signal, distances):
+        self._write_array('times/' + signal, distances.times)
+        self._write_array('distances/' + signal, distances.codes)
+
+    def close(self):
+        self.archive.close()
+
+class ColumnarHammingWriter(HammingWriter):
+    """
+    Single-file columnar layout: raw int64 column chunks followed by a JSON footer.
+
+    The footer maps each signal to the offset and length of its times and distances columns,
+    and ends with its own length and the magic bytes, so readers seek straight to one signal.
+    """
+
+    extension = '.vsthd'
+    MAGIC = b'VSTHD1\n'
+
+    def open(self):
+        self.f = open(self.path, 'wb')
+        self.f.write(self.MAGIC)
+        self.columns = {}
+
+    def write(self, signal, distances):
+        self.columns[signal] = [self.f.tell(), len(distances)]
+        distances.times.tofile(self.f)
+        distances.codes.tofile(self.f)
+
+    def close(self):
+        footer = json.dumps({"byteorder": sys.byteorder, "columns": self.columns}).encode()
+        self.f.write(footer + struct.pack('<Q', len(footer)) + self.MAGIC)
+        self.f.close()
+
+HAMMING_WRITERS = {
+    "json": JsonHammingWriter,
+    "csv": CsvHammingWriter,
+    "npz": NpzHammingWriter,
+    "columnar": ColumnarHammingWriter,
+}
+
+# Compute and write the Hamming distances of all signals
+def write_hamming_results(vcd, output_folder, name, hd_format="json", windows=None, cycles=None, hamming=None, time=None):
+    """
+    Writes hamming_distances_<name> in hd_format and hamming_summary_<name>.json.
+
+    The summary holds, per signal, the total flips, x/z changes and per-bit toggles. The sums
+    per (start, end) window in windows and per cycle between the boundaries in cycles go to
+    hamming_window_sums_<name> and hamming_cycle_sums_<name> in hd_format, as a column of the
+    nonzero sums at the window or cycle start times. Every file is streamed one signal at a
+    time. hamming maps signals to already computed HammingDistance objects to reuse. With a
+    (start, end) time window, only the changes inside it are reported.
+    Returns the path of the distances file.
+    """
+    start_time, end_time = time if time else (None, None)
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+    hamming = {} if hamming is None else hamming
+    writer_class = HAMMING_WRITERS[hd_format]
+    writer = writer_class(os.path.join(output_folder, f"hamming_distances_{name}"))
+    window_writer = writer_class(os.path.join(output_folder, f"hamming_window_sums_{name}")) if windows else None
+    cycle_writer = writer_class(os.path.join(output_folder, f"hamming_cycle_sums_{name}")) if cycles else None
+    summary_writer = JsonHammingWriter(os.path.join(output_folder, f"hamming_summary_{name}"))
+    for signal in tqdm(vcd.get_signals(), desc="Calculating Hamming distance", unit=" signals"):
+        if vcd[signal].var_type == 'real':
+            continue
+        hd = hamming.get(signal)
+        if hd is None:
+            hd = HammingDistance(vcd[signal].tv, int(vcd[signal].size), start_time=start_time, end_time=end_time)
+        writer.write(signal, hd.distances)
+        if window_writer is not None:
+            window_writer.write(signal, hd.window_sums(windows))
+        if cycle_writer is not None:
+            cycle_writer.write(signal, hd.cycle_sums(cycles))
+        summary_writer.write_entry(signal, {"total": hd.total(), "unknown": hd.unknown_total(), "bit_toggles": hd.bit_toggles()})
+    for open_writer in (writer, window_writer, cycle_writer, summary_writer):
+        if open_writer is not None:
+            open_writer.close()
+    return writer.path
+
+class HammingResults(Mapping):
+    """
+    Read-only mapping of signal -> CountHistory over a file written by a HammingWriter.
+
+    The format is taken from the file extension. Binary formats and CSV only read the
+    signal index when opened and load a signal's columns when it is looked up; JSON is
+    loaded whole.
+    """
+
+    # Initialize the HammingResults object and read the signal index
+    def __init__(self, path):
+        self.path = path
+        self.format = {writer.extension: name for name, writer in HAMMING_WRITERS.items()}.get(os.path.splitext(path)[1])
+        if self.format is None:
+            raise ValueError(f"Unknown Hamming distance file format: {path}")
+        getattr(self, '_open_' + self.format)()
+
+    def _open_json(self):
+        with open(self.path, 'r') as f:
+            self.index = json.load(f)
+
+    def _open_csv(self):
+        # Byte range of each signal's rows, rows being grouped by signal
+        self.index = {}
+        with open(self.path, 'rb') as f:
+            f.readline()
+            signal, start = None, f.tell()
+            for line in iter(f.readline, b''):
+                name = next(csv.reader([line.decode()]))[0]
+                if name != signal:
+                    end = f.tell() - len(line)
+                    if signal is not None:
+                        self.index[signal] = (start, end)
+                    signal, start = name, end
+            if signal is not None:
+                self.index[signal] = (start, f.tell())
+
+    def _open_npz(self):
+        with zipfile.ZipFile(self.path) as archive:
+            self.index = {name[len('times/'):-len('.npy')]: name for name in archive.namelist() if name.startswith('times/')}
+
+    def _open_columnar(self):
+        magic = ColumnarHammingWriter.MAGIC
+        with open(self.path, 'rb') as f:
+            f.seek(-(8 + len(magic)), os.SEEK_END)
+            footer_length = struct.unpack('<Q', f.read(8))[0]
+            if f.read() != magic:
+                raise ValueError(f"Not a columnar Hamming distance file: {self.path}")
+            f.seek(-(8 + len(magic) + footer_length), os.SEEK_END)
+            footer = json.loads(f.read(footer_length))
+        self.swap = footer["byteorder"] != sys.byteorder
+        self.index = footer["columns"]
+
+    def __getitem__(self, signal):
+        return getattr(self, '_read_' + self.format)(signal, self.index[signal])
+
+    def _read_json(self, signal, entries):
+        distances = CountHistory()
+        for time, hd in entries:
+            distances.append(time, hd)
+        return distances
+
+    def _read_csv(self, signal, byte_range):
+        start, end = byte_range
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            rows = csv.reader(f.read(end - start).decode().splitlines())
+            distances = CountHistory()
+            for _, time, hd in rows:
+                distances.append(int(time), int(hd))
+        return distances
+
+    # Read one .npy member back into an int64 array
+    @staticmethod
+    def _read_array(archive, name):
+        with archive.open(name) as member:
+            member.read(8)
+            header = member.read(struct.unpack('<H', member.read(2))[0]).decode('latin1')
+            column = array('q')
+            column.frombytes(member.read())
+        if ("'<i8'" if sys.byteorder == 'big' else "'>i8'") in header:
+            column.byteswap()
+        return column
+
+    def _read_npz(self, signal, name):
+        distances = CountHistory()
+        with zipfile.ZipFile(self.path) as archive:
+            distances.times = self._read_array(archive, name)
+            distances.codes = self._read_array(archive, 'distances/' + signal + '.npy')
+        return distances
+
+    def _read_columnar(self, signal, entry):
+        offset, count = entry
+        distances = CountHistory()
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            distances.fromfile(f, count, [])
+        if self.swap:
+            distances.times.byteswap()
+            distances.codes.byteswap()
+        return distances
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+##### Native SAIF Writer
+
+class ToggleCounter(object):
+    """
+    Per-bit SAIF switching statistics of one signal over a time interval.
+
+    T0, T1, TX and TZ are the time spent at 0, 1, x and z. TC counts direct 0->1 and 1->0
+    transitions. IG counts transitions that pass through x or z between two different known
+    values (0->x->1, 1->z->0). Bit states are kept as 1/x/z bit masks, so a change only
+    costs work for the bits that actually changed.
+    """
+
+    # Initialize the ToggleCounter object at start_time with the signal's value at that time
+    def __init__(self, width, start_time, value):
+        self.width = width
+        self.ones, self.xs, self.zs = value_masks(value, width)
+        self.known = [None] * width  # Last 0/1 state of each bit before it went to x/z
+        self.restart(start_time)
+
+    # State of one bit: 0, 1, 2 (x) or 3 (z)
+    @staticmethod
+    def _state(ones, xs, zs, bit):
+        if ones >> bit & 1:
+            return 1
+        if xs >> bit & 1:
+            return 2
+        if zs >> bit & 1:
+            return 3
+        return 0
+
+    # Start a new interval, keeping the current bit states
+    def restart(self, time):
+        self.durations = [[0] * self.width for _ in range(4)]
+        self.tc = [0] * self.width
+        self.ig = [0] * self.width
+        self.since = [time] * self.width
+
+    # Apply a value change
+    def change(self, time, value):
+        ones, xs, zs = value_masks(value, self.width)
+        changed = (ones ^ self.ones) | (xs ^ self.xs) | (zs ^ self.zs)
+        while changed:
+            low = changed & -changed
+            changed ^= low
+            bit = low.bit_length() - 1
+            old = self._state(self.ones, self.xs, self.zs, bit)
+            new = self._state(ones, xs, zs, bit)
+            self.durations[old][bit] += time - self.since[bit]
+            self.since[bit] = time
+            if old < 2:
+                if new < 2:
+                    self.tc[bit] += 1
+                else:
+                    self.known[bit] = old
+            elif new < 2 and self.known[bit] is not None and self.known[bit] != new:
+                self.ig[bit] += 1
+        self.ones, self.xs, self.zs = ones, xs, zs
+
+    # Close the interval at time, returns (T0, T1, TX, TZ, TC, IG) per bit, LSB first
+    def finish(self, time):
+        for bit in range(self.width):
+            self.durations[self._state(self.ones, self.xs, self.zs, bit)][bit] += time - self.since[bit]
+        t0, t1, tx, tz = self.durations
+        counts = list(zip(t0, t1, tx, tz, self.tc, self.ig))
+        self.restart(time)
+        return counts
+
+# Toggle counts of a signal history over consecutive intervals
+def toggle_counts(history, width, bounds):
+    """
+    Yields per-bit (T0, T1, TX, TZ, TC, IG) counts of a sorted (time, value) history for each
+    of the consecutive intervals [bounds[k], bounds[k + 1]). The value at bounds[0] is the last
+    change at or before it, x if there is none.
+    """
+    i = 0
+    end = len(history)
+    value = 'x'
+    start_time = bounds[0]
+    while i < end and history[i][0] <= start_time:
+        value = history[i][1]
+        i += 1
+    counter = ToggleCounter(width, start_time, value)
+    for stop_time in bounds[1:]:
+        while i < end and history[i][0] < stop_time:
+            counter.change(*history[i])
+            i += 1
+        yield counter.finish(stop_time)
+
+# Escape a name for SAIF
+def saif_escape(name):
+    return re.sub(r'([^A-Za-z0-9_])', r'\\\1', name)
+
+# SAIF nets of one signal: one per bit for vectors
+def saif_nets(name, bit_counts):
+    match = re.search(r'\[(\d+):(\d+)\]', name)
+    if match is None and len(bit_counts) == 1:
+        yield saif_escape(name), bit_counts[0]
+        return
+    if match:
+        base = name[:match.start()]
+        msb, lsb = int(match.group(1)), int(match.group(2))
+    else:
+        base = name
+        msb, lsb = len(bit_counts) - 1, 0
+    step = 1 if msb >= lsb else -1
+    for bit in reversed(range(len(bit_counts))):
+        yield f"{saif_escape(base)}\\[{lsb + bit * step}\\]", bit_counts[bit]
+
+# Write a SAIF file
+def write_saif_file(file_path, vcd, counts, duration):
+    """
+    Writes SAIF 2.0 text in the scope hierarchy of build_scope_hierarchy.
+
+    Args:
+        file_path (str): Output SAIF file.
+        vcd (VCDPARSE): Parser providing the signals and timescale.
+        counts (dict): Per-bit counts of each signal, as returned by ToggleCounter.finish.
+        duration (int): Duration of the interval the counts cover.
+    """
+    timescale = vcd.get_timescale()
+    lines = [
+        "(SAIFILE\n",
+        "(SAIFVERSION \"2.0\")\n",
+        "(DIRECTION \"backward\")\n",
+        "(DESIGN )\n",
+        "(VENDOR \"VCDSignalTracker\")\n",
+        "(PROGRAM_NAME \"vst.py\")\n",
+        "(DIVIDER / )\n",
+        f"(TIMESCALE {timescale.get('magnitude', 1)} {timescale.get('unit', 's')})\n",
+        f"(DURATION {duration})\n",
+    ]
+
+    def write_scope(scope, indent):
+        nets = []
+        for name, content in scope.items():
+            if not isinstance(content, dict) and content in counts:
+                for net_name, (t0, t1, tx, tz, tc, ig) in saif_nets(name, counts[content]):
+                    nets.append(f"{indent}      ({net_name}\n"
+                                f"{indent}         (T0 {t0}) (T1 {t1}) (TX {tx}) (TZ {tz})\n"
+                                f"{indent}         (TC {tc}) (IG {ig})\n"
+                                f"{indent}      )\n")
+        if nets:
+            lines.append(f"{indent}   (NET\n")
+            lines.extend(nets)
+            lines.append(f"{indent}   )\n")
+        for name, content in scope.items():
+            if isinstance(content, dict):
+                mark = len(lines)
+                lines.append(f"{indent}(INSTANCE {saif_escape(name)}\n")
+                write_scope(content, indent + "   ")
+                if len(lines) == mark + 1:
+                    del lines[mark:]  # Nothing monitored below this scope
+                else:
+                    lines.append(f"{indent})\n")
+
+    write_scope(build_scope_hierarchy(vcd), "")
+    lines.append(")\n")
+    with open(file_path, 'w') as f:
+        f.write(''.join(lines))
+
+# Generate SAIF files in-process from the monitored data groups
+def generate_native_saif_files(vcd, monitored_data_groups, windows, output_folder, cycle_times=None, active=None):
+    """
+    Computes SAIF switching statistics directly, without intermediate VCD files or vcd2saif.
+
+    Without cycles, one SAIF file is written per group, covering its window [start, end + 1).
+    With them, a SAIF file is written per clock cycle that overlaps the window of the group,
+    named like the per-cycle VCD files (prefixed with the group when there are several).
+
+    Args:
+        vcd (VCDPARSE): Parser with the monitored signals.
+        monitored_data_groups (dict): Output of monitor_signals.
+        windows (list): (start, end) window of each group, as found by find_monitor_windows.
+        output_folder (str): Folder to save the output files.
+        cycle_times (sequence): Cycle boundaries, as returned by cycle_boundaries; None for one SAIF file per group.
+        active (bytearray): Flag of each cycle, as returned by active_cycles; only flagged cycles are
+            written. All cycles are written when None.
+    """
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    start_saif_time = time_module.time()
+    files = 0
+    for (group_id, group_data), (window_start, window_end) in zip(monitored_data_groups.items(), windows):
+        widths = {signal: int(vcd[signal].size) for signal in group_data if vcd[signal].var_type != 'real'}
+
+        if cycle_times is None:
+            # Counted from the value before the window, so changes at window_start are toggles
+            counts = {}
+            for signal, width in widths.items():
+                counter = toggle_counts(group_data[signal], width, (window_start - 1, window_start, window_end + 1))
+                next(counter)
+                counts[signal] = next(counter)
+            write_saif_file(os.path.join(output_folder, f"monitored_data_group_{group_id}.saif"), vcd, counts, window_end + 1 - window_start)
+            files += 1
+            continue
+
+        # One toggle count generator per signal, advanced one cycle of the window at a time. They
+        # start a cycle early, so changes at the first cycle time count as toggles of that cycle
+        prefix = f"group_{group_id}_" if len(monitored_data_groups) > 1 else ""
+        cycles = window_cycles(cycle_times, window_start, window_end)
+        lead = 1 if cycles.start else 0
+        bounds = cycle_times[cycles.start - lead:cycles.stop + 1]
+        cycle_counts = {signal: toggle_counts(group_data[signal], width, bounds)
+                        for signal, width in widths.items()}
+        if lead:
+            for counter in cycle_counts.values():
+                next(counter)
+        for cycle in tqdm(cycles, desc=f"Writing SAIF files (group {group_id})", unit=" cycles"):
+            cycle_time, next_cycle_time = cycle_times[cycle], cycle_times[cycle + 1]
+            counts = {signal: next(counter) for signal, counter in cycle_counts.items()}
+            if active is not None and not active[cycle]:
+                continue
+            write_saif_file(os.path.join(output_folder, f"{prefix}cycle_{cycle_time}.saif"), vcd, counts, next_cycle_time - cycle_time)
+            files += 1
+
+    print(f"{files} SAIF files written in {time_module.time() - start_saif_time:.2f} seconds.")
+
+##### SAIF Conversion
+class SaifConverter(object):
+    """
+    Runs vcd2saif on written VCD files in a bounded pool of worker threads.
+
+    submit() returns as soon as a slot is free, so VCD writing overlaps with conversion. Each
+    job logs to its own <saif>.vcd2saif.log, which is kept only if the conversion fails. With
+    remove_vcd, a VCD file is deleted once its conversion succeeded. A job that raises, for
+    example because its log can't be written, counts as failed with the exception text, so
+    close() still reports every job.
+    """
+
+    # Initialize the SaifConverter object
+    def __init__(self, jobs=1, remove_vcd=False, command="vcd2saif"):
+        jobs = max(1, jobs)
+        self.remove_vcd = remove_vcd
+        self.command = command
+        self.executor = ThreadPoolExecutor(max_workers=jobs)
+        self.slots = threading.BoundedSemaphore(2 * jobs)  # Running plus queued jobs
+        self.futures = []
+        self.durations = []
+
+    # Queue one conversion, blocking while too many are in flight
+    def submit(self, vcd_file_path, saif_file_path):
+        self.slots.acquire()
+        self.futures.append(self.executor.submit(self._convert, vcd_file_path, saif_file_path))
+
+    # Run one conversion, returns (vcd_file_path, success, returncode, log_file_path, error)
+    def _convert(self, vcd_file_path, saif_file_path):
+        log_file_path = os.path.splitext(saif_file_path)[0] + ".vcd2saif.log"
+        start = time_module.perf_counter()
+        returncode = None
+        try:
+            with open(log_file_path, 'w') as log:
+                try:
+                    returncode = subprocess.run([self.command, "-input", vcd_file_path, "-output", saif_file_path],
+                                                stdout=log, stderr=subprocess.STDOUT).returncode
+                except OSError as e:
+                    log.write(f"Cannot run {self.command}: {e}\n")
+                    returncode = None
+            success = returncode == 0 and os.path.exists(saif_file_path)
+            if success:
+                os.remove(log_file_path)
+                if self.remove_vcd:
+                    os.remove(vcd_file_path)
+            return vcd_file_path, success, returncode, log_file_path, None
+        except Exception as e:
+            return vcd_file_path, False, returncode, log_file_path, f"{type(e).__name__}: {e}"
+        finally:
+            self.durations.append(time_module.perf_counter() - start)
+            self.slots.release()
+
+    # Wait for all conversions, returns the failed ones as (vcd_file_path, returncode, log_file_path, error),
+    # error being the text of the exception a job raised, None if vcd2saif itself failed
+    def close(self):
+        self.executor.shutdown(wait=True)
+        failures = [(vcd_file_path, returncode, log_file_path, error)
+                    for vcd_file_path, success, returncode, log_file_path, error in (future.result() for future in self.futures)
+                    if not success]
+        print(f"SAIF conversion: {len(self.futures) - len(failures)} succeeded, {len(failures)} failed.")
+        for vcd_file_path, returncode, log_file_path, error in failures[:10]:
+            if error is not None:
+                print(f"  {vcd_file_path}: {error}")
+            else:
+                print(f"  {vcd_file_path}: exit status {returncode}, see {log_file_path}")
+        return failures
+
+##### Helper Functions
+def validate_instances(input_instances, vcd, interactive=True):
 
     valid_instances = []
     for instance in input_instances:
         # Exact match check
-        if instance in available_instances:
+        if instance in vcd.scopes:
             valid_instances.append(instance)
         else:
-            # Check if the instance name is a part of any available instance
-            close_matches = [avail_instance for avail_instance in available_instances if instance in avail_instance and avail_instance.endswith(instance)]
+            # Check if the instance name is the end of any available instance
+            close_matches = [scope.path for scope in vcd.find_scopes(instance)]
             if len(close_matches) == 1:
                 valid_instances.append(close_matches[0])
+            elif close_matches and not interactive:
+                raise ValueError(f"Instance '{instance}' is ambiguous: {', '.join(sorted(close_matches))}")
             elif close_matches:
                 print(f"Instance '{instance}' not found. Did you mean one of the following?")
                 for i, match in enumerate(close_matches):
@@ -602,13 +2799,15 @@ def validate_instances(input_instances, signals):
                             valid_instances.append(close_matches[selected_index])
                     except (ValueError, IndexError):
                         print(f"Invalid input. Skipping instance '{instance}'.")
+            elif not interactive:
+                raise ValueError(f"Instance '{instance}' not found")
             else:
                 print(f"No close matches found for '{instance}'. Please enter a valid instance name.")
-                return validate_instances(input("Enter valid instance(s): ").split(), signals)
+                return validate_instances(input("Enter valid instance(s): ").split(), vcd)
 
     if not valid_instances:
         print("No valid instances were provided. Please try again.")
-        return validate_instances(input("Enter valid instance(s): ").split(), signals)
+        return validate_instances(input("Enter valid instance(s): ").split(), vcd)
 
     return valid_instances
 
@@ -619,23 +2818,25 @@ def find_signals_with_string(signals, target_string):
             matching_signals.append(signal)
     return matching_signals
 
-def find_enable_signals():
+def find_enable_signals(vcd, patterns, interactive=True, kind="enable"):
     # Find enable signals (if any)
     selected_enable = []
-    print("Searching for enable signals...")
-    for select_args in args.enable:
-        matching_signals = find_signals_with_string(vcd.get_signals(), select_args)
+    print(f"Searching for {kind} signals...")
+    for select_args in patterns:
+        matching_signals = vcd.find_signals(select_args)
 
         if matching_signals:
             if len(matching_signals) == 1:
                 selected_enable.append(matching_signals[0])
-                print(f"Selected enable signal: {matching_signals[0]}")
+                print(f"Selected {kind} signal: {matching_signals[0]}")
+            elif not interactive:
+                raise ValueError(f"{kind.capitalize()} signal '{select_args}' is ambiguous: {', '.join(matching_signals)}")
             else:
-                print("Multiple matching enable signals found. Please select one:")
+                print(f"Multiple matching {kind} signals found. Please select one:")
                 for idx, signal in enumerate(matching_signals, start=1):
                     print(f"{idx}: {signal}")
                 try:
-                    choice = int(input("Enter the number of the enable signal you want to select: "))
+                    choice = int(input(f"Enter the number of the {kind} signal you want to select: "))
                 except ValueError:
                     print("Invalid input! Please enter a number.")
                     exit()
@@ -643,13 +2844,426 @@ def find_enable_signals():
                     print("Invalid choice. Exiting...")
                     exit()
                 selected_enable.append(matching_signals[choice - 1])
-                print(f"Selected enable signal: {matching_signals[choice - 1]}")
+                print(f"Selected {kind} signal: {matching_signals[choice - 1]}")
+        elif not interactive:
+            raise ValueError(f"No {kind} signals found containing '{select_args}'")
         else:
-            print(f"No enable signals found containing '{select_args}'. Exiting...")
+            print(f"No {kind} signals found containing '{select_args}'. Exiting...")
             exit()
     return selected_enable
 
+def find_clock_signal(vcd, name, interactive=True):
+    # Find the one-bit clock signal
+    clock_signal = find_enable_signals(vcd, [name], interactive, kind="clock")[0]
+    if int(vcd[clock_signal].size) != 1:
+        if not interactive:
+            raise ValueError(f"Clock signal '{clock_signal}' is {vcd[clock_signal].size} bits wide, not 1")
+        print(f"Clock signal '{clock_signal}' is {vcd[clock_signal].size} bits wide, not 1. Exiting...")
+        exit()
+    return clock_signal
+
+##### Library API
+class TrackerConfig(object):
+    """Options of a VcdSignalTracker, with the same meaning and defaults as the command line flags."""
+
+    # Initialize the TrackerConfig object
+    def __init__(self, instances=None, enable=None, enable_mode="any", time=None, clock=None, jobs=1, use_cache=True,
+                 identifier_order="scope", cycle_archive=False, saif_jobs=1, vcd2saif="vcd2saif", remove_vcd_files=False,
+                 clock_signal=None, clock_edge="rising", skip_idle_cycles=False):
+        self.instances = instances
+        self.enable = enable
+        self.enable_mode = enable_mode
+        self.time = time
+        self.clock = clock
+        self.clock_signal = clock_signal
+        self.clock_edge = clock_edge
+        self.skip_idle_cycles = skip_idle_cycles
+        self.jobs = jobs
+        self.use_cache = use_cache
+        self.identifier_order = identifier_order
+        self.cycle_archive = cycle_archive
+        self.saif_jobs = saif_jobs
+        self.vcd2saif = vcd2saif
+        self.remove_vcd_files = remove_vcd_files
+
+    # Build the TrackerConfig of the command line options in args
+    @classmethod
+    def from_args(cls, args):
+        return cls(instances=args.instances, enable=args.enable, enable_mode=args.enable_mode, time=args.time, clock=args.clock,
+                   jobs=args.jobs, use_cache=not args.no_cache, identifier_order=args.identifier_order,
+                   cycle_archive=args.cycle_archive, saif_jobs=args.saif_jobs, vcd2saif=args.vcd2saif,
+                   remove_vcd_files=args.remove_vcd_files, clock_signal=args.clock_signal, clock_edge=args.clock_edge,
+                   skip_idle_cycles=args.skip_idle_cycles)
+
+    def __repr__(self):
+        return pp.pformat(self.__dict__)
+
+class VcdSignalTracker(object):
+    """
+    Tracks the signals of one VCD file without touching the command line or module state.
+
+    Instance and enable names are resolved without prompting: unknown or ambiguous names raise
+    ValueError. With interactive True, they are asked on the terminal like on the command line,
+    which runs on this class. Value changes are parsed once, on first use, and trackers of
+    different files can be used side by side in one process. Reading the definitions and the
+    value changes is timed into metrics when given.
+
+    Example:
+        tracker = VcdSignalTracker("dump.vcd", TrackerConfig(instances=["top.dut"], enable=["valid"]))
+        windows = tracker.windows()
+        tracker.write_vcd("output/dump")
+    """
+
+    # Initialize the VcdSignalTracker object
+    def __init__(self, vcd_path, config=None, interactive=False, metrics=None):
+        self.config = config if config is not None else TrackerConfig()
+        self.metrics = metrics if metrics is not None else Metrics()
+        with self.metrics.stage("definitions"):
+            self.vcd = VCDPARSE(vcd_path=vcd_path, use_cache=self.config.use_cache)
+            self.vcd.read_definitions()
+        signals = self.vcd.get_signals()
+        if self.config.instances:
+            signals = self.vcd.subtree_signals(validate_instances(self.config.instances, self.vcd, interactive))
+        self.enable = find_enable_signals(self.vcd, self.config.enable, interactive) if self.config.enable else []
+        if self.enable:
+            try:
+                enable_condition(self.config.enable_mode, len(self.enable))
+            except ValueError as e:
+                if not interactive:
+                    raise
+                print(e)
+                exit()
+        # The clock is parsed even when it is outside the instances
+        self.clock_signal = find_clock_signal(self.vcd, self.config.clock_signal, interactive) if self.config.clock_signal else None
+        clock = [self.clock_signal] if self.clock_signal and self.clock_signal not in signals else []
+        self.vcd.select(self.enable + clock + signals)
+        self.identifiers = {}
+        self._loaded = False
+        self._hamming = {}
+        self._windows = None
+        self._monitored_data_groups = None
+        self._cycle_times = None
+        self._active = None
+
+    # Get the tracked signals
+    def signals(self):
+        return self.vcd.get_signals()
+
+    # Check if cycles are delimited by a clock period or signal
+    def clocked(self):
+        return bool(self.config.clock or self.clock_signal)
+
+    # Parse the value changes of the tracked signals once
+    def load(self):
+        if not self._loaded:
+            start_time, end_time = self.config.time if self.config.time else (None, None)
+            with self.metrics.stage("value_changes"):
+                self.vcd.read_value_changes(start_time, end_time, jobs=self.config.jobs)
+            self._loaded = True
+            if self.config.identifier_order == "toggles":
+                assign_identifiers_by_toggles(self.vcd, self.identifiers)
+        return self.vcd
+
+    # Get the (start, end) windows in which the enable condition holds, computed once
+    def windows(self):
+        if self._windows is None:
+            self._windows = find_monitor_windows(self.load(), self.enable, self.config.enable_mode)
+        return self._windows
+
+    # Get the monitored data groups, one per enable window, computed once
+    def monitor(self):
+        if self._monitored_data_groups is None:
+            self._monitored_data_groups = monitor_signals(self.load(), self.signals(), self.enable, self.config.enable_mode)
+        return self._monitored_data_groups
+
+    # Get the value of a signal at a specific time
+    def value_at(self, signal, time):
+        return self.load()[signal][time]
+
+    # Get the values of signals at many times
+    def sample(self, signals, times):
+        return self.load().sample(signals, times)
+
+    # Get the Hamming distances of a signal
+    def hamming(self, signal):
+        hd = self._hamming.get(signal)
+        if hd is None:
+            vcd = self.load()
+            start_time, end_time = self.config.time if self.config.time else (None, None)
+            hd = self._hamming[signal] = HammingDistance(vcd[signal].tv, int(vcd[signal].size), start_time=start_time, end_time=end_time)
+        return hd
+
+    # Get the boundaries of the clock cycles, computed once; None without a clock
+    def cycles(self):
+        if self._cycle_times is None and self.clocked():
+            self._cycle_times = cycle_boundaries(self.load(), self.config.clock, self.clock_signal, self.config.clock_edge, self.config.time)
+        return self._cycle_times
+
+    # Get the flags of the cycles to write, computed once; None to write them all
+    def active_cycles(self):
+        if self._active is None and self.config.skip_idle_cycles and self.clocked():
+            self._active = active_cycles(self.load(), [signal for signal in self.signals() if signal != self.clock_signal], self.cycles())
+        return self._active
+
+    # Get a converter running vcd2saif on the written VCD files, None without saif
+    def _saif_converter(self, saif):
+        return SaifConverter(self.config.saif_jobs, self.config.remove_vcd_files, self.config.vcd2saif) if saif else None
+
+    # Write the monitored value changes as VCD files, one per cycle with a clock; returns the SaifConverter, if any
+    def write_vcd(self, output_folder, saif=False):
+        converter = self._saif_converter(saif)
+        monitored_data_groups = self.monitor()
+        cycle_times = self.cycles()
+        if cycle_times is not None:
+            archive = self.config.cycle_archive and converter is None
+            generate_vcd_files_with_groups(self.vcd, cycle_times, monitored_data_groups, output_folder, archive=archive,
+                                           converter=converter, identifiers=self.identifiers, active=self.active_cycles(),
+                                           windows=self.windows())
+        else:
+            generate_one_vcd_file_monitored_data(self.vcd, monitored_data_groups, output_folder, converter, self.identifiers)
+        return converter
+
+    # Write SAIF files of the monitored windows with the native writer
+    def write_saif(self, output_folder):
+        monitored_data_groups = self.monitor()
+        cycle_times = self.cycles()
+        if cycle_times is not None:
+            generate_native_saif_files(self.vcd, monitored_data_groups, self.windows(), output_folder, cycle_times, self.active_cycles())
+        else:
+            generate_native_saif_files(self.vcd, monitored_data_groups, self.windows(), output_folder)
+
+    # Stream the monitored value changes into the group VCD files in one pass, without parsing them into histories;
+    # returns the SaifConverter, if any
+    def stream(self, output_folder, saif=False):
+        if self.clocked() or self._loaded:
+            raise ValueError("Streaming is not supported with a clock or after the value changes are parsed")
+        converter = self._saif_converter(saif)
+        start_time, end_time = self.config.time if self.config.time else (None, None)
+        stream_monitored_data(self.vcd, self.signals(), self.enable, output_folder, start_time, end_time, self.config.enable_mode,
+                              converter=converter)
+        return converter
+
+    # Write the Hamming distances and their summary, returns the path of the distances file
+    def write_hamming(self, output_folder, hd_format="json"):
+        vcd = self.load()
+        windows = self.windows() if self.enable else None
+        return write_hamming_results(vcd, output_folder, os.path.basename(self.vcd.vcd_path), hd_format, windows,
+                                     self.cycles(), self._hamming, self.config.time)
+
+    # Get the paths of the files write_hamming writes, the sums files only exist with enable signals or a clock
+    def hamming_outputs(self, output_folder, hd_format="json"):
+        name = os.path.basename(self.vcd.vcd_path)
+        extension = HAMMING_WRITERS[hd_format].extension
+        return [os.path.join(output_folder, f"hamming_distances_{name}{extension}"),
+                os.path.join(output_folder, f"hamming_summary_{name}.json"),
+                os.path.join(output_folder, f"hamming_window_sums_{name}{extension}"),
+                os.path.join(output_folder, f"hamming_cycle_sums_{name}{extension}")]
+
+##### Batch Processing
+# Estimated peak memory of processing a VCD file, per byte of its decompressed text
+_BATCH_MEMORY_FACTOR = 16
+
+# Physical memory in bytes, or None where it can't be read
+def physical_memory():
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+# Process one VCD file of a batch, with its output going to a log file
+def _run_batch_file(vcd_file, log_path, args):
+    entry = {"file": vcd_file, "log": log_path}
+    start = time_module.time()
+    with open(log_path, 'w') as log, redirect_stdout(log), redirect_stderr(log):
+        try:
+            entry.update(process_vcd_file(vcd_file, args, interactive=False))
+            entry["status"] = "ok"
+        except Exception as e:
+            traceback.print_exc()
+            entry["status"] = "failed"
+            entry["error"] = f"{type(e).__name__}: {e}"
+    entry["seconds"] = round(time_module.time() - start, 3)
+    return entry
+
+# Process VCD files in a process pool
+def run_batch(vcd_files, args):
+    """
+    Processes VCD files in parallel worker processes without asking anything on the terminal.
+
+    Instance and enable selections from args apply to every file; a file where they are
+    ambiguous or missing fails instead of prompting. A file is only started while the
+    estimated memory of the running files (_BATCH_MEMORY_FACTOR times their decompressed size) stays
+    within args.max_memory MB, half the physical memory by default; one file always runs,
+    and at most args.max_workers files run at the same time.
+    Each file logs to <output>/logs/<file>.log and the results of all files are written
+    to <output>/batch_manifest.json.
+
+    Returns the manifest entries, in the order of vcd_files.
+    """
+    output_root = args.output_folder if args.output_folder else "output"
+    log_folder = os.path.join(output_root, "logs")
+    if not os.path.exists(log_folder):
+        os.makedirs(log_folder)
+
+    if args.max_memory is not None:
+        budget = args.max_memory << 20
+    else:
+        budget = physical_memory()
+        budget = budget // 2 if budget else None
+    estimates = {vcd_file: decompressed_size(vcd_file) * _BATCH_MEMORY_FACTOR for vcd_file in vcd_files}
+
+    start_batch_time = time_module.time()
+    pending = list(vcd_files)
+    running = {}
+    entries = {}
+    with ProcessPoolExecutor(max_workers=args.max_workers) as executor, \
+         tqdm(total=len(vcd_files), desc="Processing VCD files", unit=" files") as pbar:
+        while pending or running:
+            # Admit files in order while their estimated memory fits next to the running ones
+            in_use = sum(estimates[vcd_file] for vcd_file in running.values())
+            while pending and (not running or budget is None or in_use + estimates[pending[0]] <= budget):
+                vcd_file = pending.pop(0)
+                log_path = os.path.join(log_folder, os.path.basename(vcd_file) + ".log")
+                running[executor.submit(_run_batch_file, vcd_file, log_path, args)] = vcd_file
+                in_use += estimates[vcd_file]
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                vcd_file = running.pop(future)
+                try:
+                    entry = future.result()
+                except Exception as e:  # The worker process itself died
+                    entry = {"file": vcd_file, "status": "failed", "error": f"{type(e).__name__}: {e}"}
+                entry["estimated_memory"] = estimates[vcd_file]
+                entries[vcd_file] = entry
+                if entry["status"] != "ok":
+                    tqdm.write(f"Failed: {vcd_file} ({entry['error']})")
+                pbar.update(1)
+
+    manifest = [entries[vcd_file] for vcd_file in vcd_files]
+    manifest_path = os.path.join(output_root, "batch_manifest.json")
+    with open(manifest_path, 'w') as f:
+        json.dump({"files": manifest, "seconds": round(time_module.time() - start_batch_time, 3)}, f, indent=4)
+
+    failed = sum(1 for entry in manifest if entry["status"] != "ok")
+    print(f"{len(manifest) - failed} of {len(manifest)} VCD files processed in {time_module.time() - start_batch_time:.2f} seconds, "
+          f"{failed} failed. Manifest: {manifest_path}")
+    return manifest
+
 ##### Main Function
+# Summarize a processed VCD file, counting the parser statistics and written outputs into metrics
+def summarize_run(vcd, output_folder, metrics, outputs, converter=None):
+    for name, value in vcd.stats.items():
+        metrics.count(name, value)
+    for output in [outputs] if isinstance(outputs, str) else outputs:
+        if os.path.exists(output):
+            size, files = tree_size(output)
+            metrics.count("bytes_written", size)
+            metrics.count("files_written", files)
+    if converter is not None:
+        metrics.record("saif_conversion", sum(converter.durations))
+        metrics.count("saif_conversions", len(converter.durations))
+    return {"signals": len(vcd.get_signals()), "begintime": vcd.get_begintime(), "endtime": vcd.get_endtime(),
+            "output": output_folder, "metrics": metrics.report()}
+
+# Process one VCD file
+def process_vcd_file(vcd_file, args, interactive=True):
+    """
+    Runs the whole flow on one VCD file with the command line options in args.
+
+    With interactive False, nothing is asked on the terminal: ambiguous or unknown instance
+    and enable names raise ValueError instead. Returns a summary of the file, including
+    the report of its Metrics.
+    """
+
+    output_root = args.output_folder if args.output_folder else "output"
+    profile_path = None
+    if args.profile:
+        profile_path = os.path.join(output_root, "profile", vcd_stem(vcd_file))
+        os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+    metrics = Metrics(profile_path)
+    clocked = bool(args.clock or args.clock_signal)
+
+    print("=====================================")
+    if not clocked:
+        print("Reading Scopes and Signals definitions of VCD file...")
+    else:
+        print("Reading VCD files, monitoring signals and generating output files...")
+
+    # Read the definitions and select the signals of the instances, enable and clock signals
+    start_time_definition = time_module.time()
+    tracker = VcdSignalTracker(vcd_file, TrackerConfig.from_args(args), interactive, metrics)
+    vcd = tracker.vcd
+    if not clocked:
+        print(f"Read successfully in {metrics.seconds('definitions'):.2f} seconds.")
+        print(f"Total number of signals: {len(vcd.references_to_ids)}")
+        print("=====================================")
+        if not args.instances:
+            print("No instances specified. Monitoring all instances.")
+        if not tracker.enable:
+            print("No enable signals provided, monitoring all times...")
+        print("=====================================")
+        print("Removing unwanted signals...")
+        print(f"Total number of signals to monitor: {len(vcd.get_signals())}")
+
+    # Streaming mode: parse, window and write in one pass without keeping histories
+    if args.stream and (clocked or args.hamming_distance or args.native_saif):
+        print("--stream is not supported with --clock, --clock_signal, --hamming_distance or --native_saif, reading value changes into memory.")
+    elif args.stream:
+        print("=====================================")
+        print("Streaming value changes into output files...")
+        output_folder = os.path.join(output_root, vcd_stem(vcd_file))
+        with metrics.stage("streaming"):
+            converter = tracker.stream(output_folder, args.generate_saif_files)
+        print(f"Total time duration of VCD file: {vcd.get_begintime()} to {vcd.get_endtime()}.")
+        print("=====================================")
+        return summarize_run(vcd, output_folder, metrics, output_folder, converter)
+
+    if not clocked:
+        print("=====================================")
+        print("Reading value changes...")
+    tracker.load()
+    if not clocked:
+        print(f"Read value changes successfully in {metrics.seconds('value_changes'):.2f} seconds.")
+        print(f"Total time duration of VCD file: {vcd.get_begintime()} to {vcd.get_endtime()}.")
+
+        print("=====================================")
+
+    if not args.hamming_distance:  
+        print("Monitoring signals...")
+        with metrics.stage("monitoring"):
+            tracker.monitor()
+        print(f"Monitoring data collected successfully in {metrics.seconds('monitoring'):.2f} seconds.")
+
+        print("=====================================")
+        print("Generating output files...")
+        converter = None
+        output_folder = os.path.join(output_root, vcd_stem(vcd_file))
+        with metrics.stage("writing"):
+            active = tracker.active_cycles()
+            if active is not None:
+                print(f"{sum(active)} of {len(active)} cycles have activity, skipping the others.")
+            if args.native_saif:
+                tracker.write_saif(output_folder)
+            else:
+                if clocked and args.cycle_archive and args.generate_saif_files:
+                    print("--cycle_archive is not supported with -saif, writing one file per cycle.")
+                converter = tracker.write_vcd(output_folder, args.generate_saif_files)
+        if not clocked:
+            print(f"Output files generated successfully in {metrics.seconds('writing'):.2f} seconds.")
+        else:
+            print(f"Output files generated successfully in {time_module.time() - start_time_definition:.2f} seconds.")
+        print("=====================================")
+        return summarize_run(vcd, output_folder, metrics, output_folder, converter)
+    else:
+        print("Calculating Hamming distance...")
+        with metrics.stage("hamming"):
+            output_file = tracker.write_hamming(output_root, args.hd_format)
+
+        print(f"Hamming distance calculated and written to {output_file} successfully in {metrics.seconds('hamming'):.2f} seconds.")
+        print("=====================================")
+        return summarize_run(vcd, output_root, metrics, tracker.hamming_outputs(output_root, args.hd_format))
+
 if __name__ == "__main__":
 
     args = parse_args()
@@ -657,120 +3271,23 @@ if __name__ == "__main__":
     # Extract VCD files
     vcd_files = []
     if args.folder:
-        for file in os.listdir(args.folder):
-            if file.endswith(".vcd"):
+        for file in sorted(os.listdir(args.folder)):
+            if file.endswith(VCD_SUFFIXES):
                 vcd_files.append(os.path.join(args.folder, file))
     elif args.vcd_file:
         vcd_files.append(args.vcd_file)
-
-    # Process each VCD file
-    for vcd_file in vcd_files:
-
-        print("=====================================")
-        if not args.clock:
-            print("Reading Scopes and Signals definitions of VCD file...")
-        else:
-            print("Reading VCD files, monitoring signals and generating output files...")
-
-        start_time_definition = time_module.time()
-        vcd = VCDPARSE(vcd_path=vcd_file)
-        vcd.read_definitions()
-        end_time_definition = time_module.time()
-        if not args.clock:
-            print(f"Read successfully in {end_time_definition - start_time_definition:.2f} seconds.")
-            print(f"Total number of signals: {len(vcd.get_signals())}")
-
-            print("=====================================")
-        # Check if instances are provided, if not, select all
-        if not args.instances:
-            if not args.clock:
-                print("No instances specified. Monitoring all instances.")
-            instances = "All"
-        else:
-            # Validate the provided instances
-            instances = validate_instances(args.instances, vcd.get_signals())
-
-        def filter_signals_by_instance(signals, instances):
-            return [signal for signal in signals if any(instance in signal for instance in instances)]
-
-        # Filter signals to include only those that belong to the specified instances
-        signals = filter_signals_by_instance(vcd.get_signals(), instances) if instances!="All" else vcd.get_signals()
-
-        # Find enable signals (if any)
-        selected_enable = []
-        if args.enable:
-            selected_enable = find_enable_signals()
-        if not selected_enable:
-            if not args.clock:
-                print("No enable signals provided, monitoring all times...")
-        
-        signals = selected_enable + signals
-
-        if not args.clock:
-            print("=====================================")
-            print("Removing unwanted signals...")
-            
-        # Remove unwanted signals from the vcd object
-        unwanted_signals = set(vcd.get_signals()) - set(signals)
-        for signal in unwanted_signals:
-            vcd.get_data().pop(signal, None)
-            vcd.get_signals().remove(signal)
-        
-        if not args.clock:
-            print(f"Total number of signals to monitor: {len(vcd.get_signals())}")
-        
-        if not args.clock:
-            print("=====================================")
-            print("Reading value changes...")
-        start_time_read_changes = time_module.time()
-        start_time, end_time = args.time if args.time else None, None
-        vcd.read_value_changes(start_time, end_time)
-        end_time_read_changes = time_module.time()
-        if not args.clock:
-            print(f"Read value changes successfully in {end_time_read_changes - start_time_read_changes:.2f} seconds.")
-            print(f"Total time duration of VCD file: {vcd.get_begintime()} to {vcd.get_endtime()}.")
-
-            print("=====================================")
-
-        if not args.hamming_distance:  
-            print("Monitoring signals...")
-            start_time_monitor = time_module.time() 
-            monitored_data_groups = monitor_signals(vcd, vcd.get_signals(), selected_enable)
-            end_time_monitor = time_module.time()
-            print(f"Monitoring data collected successfully in {end_time_monitor - start_time_monitor:.2f} seconds.")
-
-            print("=====================================")
-            print("Generating output files...")
-            start_time_generate = time_module.time()
-            output_folder = os.path.join(args.output_folder if args.output_folder else "output", os.path.splitext(os.path.basename(vcd_file))[0])
-            clock_period = args.clock if args.clock else 2
-            start_time, end_time = args.time if args.time else (vcd.get_begintime(), vcd.get_endtime())
-            num_cycles = math.ceil((end_time - start_time) / clock_period)
-            if args.clock:
-                generate_vcd_files_with_groups(start_time, num_cycles, monitored_data_groups, output_folder)
-            else:
-                generate_one_vcd_file_monitored_data(monitored_data_groups, output_folder)
-            end_time_generate = time_module.time()
-            if not args.clock:
-                print(f"Output files generated successfully in {end_time_generate - start_time_generate:.2f} seconds.")
-            else:
-                print(f"Output files generated successfully in {end_time_generate - start_time_definition:.2f} seconds.")
-            print("=====================================")
-        else:
-            print("Calculating Hamming distance...")
-            start_time_hamming = time_module.time()
-            hamming_distances = {}
-            for signal in vcd.get_signals():
-                signal_data = vcd[signal].hamming_distance
-                hamming_distances[signal] = signal_data
-
-            output_folder = args.output_folder if args.output_folder else "output"
-            if not os.path.exists(output_folder):
-                os.makedirs(output_folder)
-            output_file = os.path.join(output_folder, f"hamming_distances_{os.path.basename(vcd_file)}.json")
-            with open(output_file, 'w') as f:
-                json.dump(hamming_distances, f, indent=4)
-
-            end_time_hamming = time_module.time()
-            print(f"Hamming distance calculated and written to {output_file} successfully in {end_time_hamming - start_time_hamming:.2f} seconds.")
-            print("=====================================")
+    if args.clock and args.clock_signal:
+        print("Use either --clock or --clock_signal, not both. Exiting...")
+        exit()
+    if zstandard is None and any(vcd_file.endswith('.zst') for vcd_file in vcd_files):
+        print("Reading .zst files needs the zstandard package (pip install zstandard). Exiting...")
+        exit()
+
+    # Process the VCD files in a worker pool, or one after the other
+    start_run_time = time_module.time()
+    if args.batch:
+        results = run_batch(vcd_files, args)
+    else:
+        results = [{"file": vcd_file, **process_vcd_file(vcd_file, args)} for vcd_file in vcd_files]
+    if args.metrics:
+        write_metrics(args.metrics, results, time_module.time() - start_run_time)
@@ -0,0 +1,479 @@
+"""
+Synthetic VCD generator and benchmark harness for vst.py.
+
+    python vst_bench.py generate synth.vcd --signals 1000 --steps 100000 --xz-rate 0.01
+    python vst_bench.py run --steps 10000 100000 1000000 --results results.json
+    python vst_bench.py compare baseline.json results.json
+    python vst_bench.py scenarios --scale 0.01 --results scenarios.json
+
+Generated files are deterministic for a given set of options, so results of different
+commits can be compared on the same input.
+"""
+import  argparse
+from    concurrent.futures import ProcessPoolExecutor
+from    contextlib import redirect_stderr, redirect_stdout
+import  json
+import  os
+import  platform
+import  random
+import  subprocess
+import  sys
+import  tempfile
+import  time as time_module
+import  tracemalloc
+
+import  vst
+
+##### Parse Command Line Arguments
+# Add the options of the synthetic VCD generator to a parser
+def add_generator_args(parser):
+    parser.add_argument("--signals", type=int, default=100, help="Number of generated signals, besides top.clk and top.en.")
+    parser.add_argument("--widths", type=int, nargs='+', default=[1, 1, 8, 32], help="Bus widths, assigned to the signals in turn.")
+    parser.add_argument("--depth", type=int, default=3, help="Depth of the scope hierarchy.")
+    parser.add_argument("--fanout", type=int, default=4, help="Number of child scopes of each scope.")
+    parser.add_argument("--density", type=float, default=0.05, help="Fraction of the signals changing at each time step.")
+    parser.add_argument("--xz-rate", type=float, default=0.001, help="Probability of a change being to x or z.")
+    parser.add_argument("--enable-rate", type=float, default=0.01, help="Probability of top.en toggling at each time step.")
+    parser.add_argument("--timescale", default="1ps", help="Timescale of the generated file.")
+    parser.add_argument("--time-step", type=int, default=1, help="Time between two steps, in timescale units.")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed.")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic VCD files and benchmark vst.py on them.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Write one synthetic VCD file.")
+    generate.add_argument("vcd_file", help="Path of the VCD file to write.")
+    generate.add_argument("--steps", type=int, default=10000, help="Number of time steps.")
+    add_generator_args(generate)
+
+    run = commands.add_parser("run", help="Benchmark vst.py over a sweep of generated file sizes.")
+    run.add_argument("--steps", type=int, nargs='+', default=[10000, 100000], help="Number of time steps of each file of the sweep.")
+    run.add_argument("--cycles", type=int, default=100, help="Number of clock cycles for the per-cycle VCD writer.")
+    run.add_argument("-j", "--jobs", type=int, default=1, help="Worker processes for read_value_changes.")
+    run.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "vst_bench"), help="Folder keeping the generated VCD files between runs.")
+    run.add_argument("--results", default="bench_results.json", help="JSON file to write the results to.")
+    run.add_argument("--compare", help="Results file of an earlier run to compare against.")
+    add_generator_args(run)
+
+    scenarios = commands.add_parser("scenarios", help="Benchmark the scenarios of the optimization requests.")
+    scenarios.add_argument("--only", nargs='+', choices=sorted(SCENARIOS), help="Scenarios to run (default: all).")
+    scenarios.add_argument("--scale", type=float, default=0.01, help="Fraction of the full scenario sizes to run; 1 runs the full sizes.")
+    scenarios.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "vst_bench"), help="Folder keeping the generated VCD files between runs.")
+    scenarios.add_argument("--results", default="bench_scenarios.json", help="JSON file to write the results to.")
+    scenarios.add_argument("--compare", help="Results file of an earlier run to compare against.")
+
+    compare = commands.add_parser("compare", help="Compare two results files.")
+    compare.add_argument("baseline", help="Results file of the reference run.")
+    compare.add_argument("results", help="Results file to compare.")
+    return parser.parse_args()
+
+##### Synthetic VCD Generator
+# Yield the scope paths of the hierarchy in depth-first order
+def scope_paths(depth, fanout, path=("top",)):
+    yield path
+    if len(path) < depth:
+        for i in range(fanout):
+            yield from scope_paths(depth, fanout, path + (f"u{i}",))
+
+# Write a synthetic VCD file
+def generate_vcd(path, steps, signals=100, widths=(1, 1, 8, 32), depth=3, fanout=4, density=0.05, xz_rate=0.001,
+                 enable_rate=0.01, timescale="1ps", time_step=1, seed=1):
+    """
+    Writes a VCD file with top.clk toggling at every step, an enable top.en toggling with
+    probability enable_rate per step and signals spread over a depth x fanout scope tree.
+
+    At each step a density fraction of the signals changes: single bits toggle and buses
+    take a random value; with probability xz_rate the new value holds x or z bits instead.
+    Returns the number of value changes written.
+    """
+    rng = random.Random(seed)
+    scopes = list(scope_paths(depth, fanout))
+    widths = [widths[i % len(widths)] for i in range(signals)]
+    identifiers = [vst.generate_identifier(i) for i in range(signals + 2)]
+    clock_id, enable_id, signal_ids = identifiers[0], identifiers[1], identifiers[2:]
+
+    # Header, with signal i in scope i modulo the number of scopes
+    members = [[] for _ in scopes]
+    for i in range(signals):
+        members[i % len(scopes)].append(i)
+    lines = ["$date synthetic $end\n", "$version vst_bench $end\n", f"$timescale {timescale} $end\n"]
+    open_scopes = []
+    for scope, scope_members in zip(scopes, members):
+        while open_scopes and open_scopes != list(scope[:len(open_scopes)]):
+            open_scopes.pop()
+            lines.append("$upscope $end\n")
+        lines.append(f"$scope module {scope[-1]} $end\n")
+        open_scopes.append(scope[-1])
+        if len(scope) == 1:
+            lines.append(f"$var wire 1 {clock_id} clk $end\n")
+            lines.append(f"$var wire 1 {enable_id} en $end\n")
+        for i in scope_members:
+            if widths[i] == 1:
+                lines.append(f"$var wire 1 {signal_ids[i]} s{i} $end\n")
+            else:
+                lines.append(f"$var wire {widths[i]} {signal_ids[i]} s{i} [{widths[i] - 1}:0] $end\n")
+    lines.extend("$upscope $end\n" for _ in open_scopes)
+    lines.append("$enddefinitions $end\n")
+
+    # Initial values
+    state = ['0'] * signals
+    lines.append("#0\n$dumpvars\n")
+    lines.append(f"0{clock_id}\n0{enable_id}\n")
+    for i in range(signals):
+        lines.append(f"0{signal_ids[i]}\n" if widths[i] == 1 else f"b0 {signal_ids[i]}\n")
+    lines.append("$end\n")
+
+    changes = signals + 2
+    clock = enable = 0
+    population = range(signals)
+    with open(path, 'w') as f:
+        for step in range(1, steps):
+            clock ^= 1
+            lines.append(f"#{step * time_step}\n{clock}{clock_id}\n")
+            changes += 1
+            if rng.random() < enable_rate:
+                enable ^= 1
+                lines.append(f"{enable}{enable_id}\n")
+                changes += 1
+            for i in rng.sample(population, int(density * signals + rng.random())):
+                width = widths[i]
+                if xz_rate and rng.random() < xz_rate:
+                    bit = rng.randrange(width)
+                    value = format(rng.getrandbits(width), f'0{width}b')
+                    value = value[:bit] + rng.choice('xz') + value[bit + 1:]
+                elif width == 1:
+                    value = '0' if state[i] == '1' else '1'
+                else:
+                    value = format(rng.getrandbits(width), f'0{width}b')
+                state[i] = value
+                lines.append(f"{value}{signal_ids[i]}\n" if width == 1 else f"b{value} {signal_ids[i]}\n")
+                changes += 1
+            if len(lines) >= 1 << 16:
+                f.write(''.join(lines))
+                lines = []
+        f.write(''.join(lines))
+    return changes
+
+# Get the generator options of parsed arguments as keyword arguments
+def generator_options(args):
+    return {"signals": args.signals, "widths": args.widths, "depth": args.depth, "fanout": args.fanout,
+            "density": args.density, "xz_rate": args.xz_rate, "enable_rate": args.enable_rate,
+            "timescale": args.timescale, "time_step": args.time_step, "seed": args.seed}
+
+##### Benchmark Harness
+# Run fn as a named stage of metrics, recording the memory high water mark after it in peaks
+def timed_stage(metrics, peaks, stage_name, fn, *fn_args, **fn_kwargs):
+    with metrics.stage(stage_name):
+        result = fn(*fn_args, **fn_kwargs)
+    peaks[stage_name] = (vst.peak_rss() or {}).get("self")
+    return result
+
+# Get the results of the stages of metrics, with throughputs when the work size is known
+def stage_results(metrics, peaks, file_bytes=None, changes=None):
+    stages = {}
+    for stage_name, timing in metrics.report()["stages"].items():
+        seconds = timing["seconds"]
+        stages[stage_name] = {
+            "seconds": seconds,
+            "cpu_seconds": timing["cpu_seconds"],
+            "changes_per_s": round(changes / seconds) if seconds and changes else None,
+            "mb_per_s": round(file_bytes / 1e6 / seconds, 3) if seconds and file_bytes else None,
+            "peak_rss": peaks[stage_name],
+        }
+    return stages
+
+# Get a generated VCD file from workdir, writing it first if it isn't there yet
+def generated_vcd(workdir, name, steps, **options):
+    os.makedirs(workdir, exist_ok=True)
+    key = "_".join(f"{value}" if not isinstance(value, (list, tuple)) else "-".join(map(str, value)) for value in options.values())
+    vcd_path = os.path.join(workdir, f"{name}_{steps}_{key}.vcd")
+    if not os.path.exists(vcd_path):
+        print(f"Generating {vcd_path}...")
+        tmp_path = vcd_path + ".tmp"
+        generate_vcd(tmp_path, steps, **options)
+        os.replace(tmp_path, vcd_path)
+    return vcd_path
+
+# Run one benchmark case in the current process
+def run_case(vcd_path, steps, cycles=100, jobs=1):
+    """
+    Times the stages of vst.py on one VCD file, writing outputs into a temporary folder.
+
+    Peak RSS is the high water mark of the process after each stage, so this should run
+    in a fresh process per file. Returns the stage results as a dict.
+    """
+    file_bytes = os.path.getsize(vcd_path)
+    metrics = vst.Metrics()
+    peaks = {}
+    name = os.path.basename(vcd_path)
+
+    def stage(stage_name, fn, *fn_args, **fn_kwargs):
+        return timed_stage(metrics, peaks, stage_name, fn, *fn_args, **fn_kwargs)
+
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull), redirect_stderr(devnull), \
+         tempfile.TemporaryDirectory() as output_folder:
+        vcd = vst.VCDPARSE(vcd_path=vcd_path)
+        stage("read_definitions", vcd.read_definitions)
+        stage("read_value_changes", vcd.read_value_changes, jobs=jobs)
+        signals = vcd.get_signals()
+        groups = stage("monitor_signals", vst.monitor_signals, vcd, signals, [])
+        stage("monitor_signals_enable", vst.monitor_signals, vcd, signals, ["top.en"])
+        stage("generate_one_vcd_file_monitored_data", vst.generate_one_vcd_file_monitored_data,
+              vcd, groups, os.path.join(output_folder, "one"))
+        start_time, end_time = vcd.get_begintime(), vcd.get_endtime()
+        clock_period = max(1, -(-(end_time - start_time) // cycles))
+        stage("generate_vcd_files_with_groups", vst.generate_vcd_files_with_groups,
+              vcd, vst.periodic_cycle_times(start_time, end_time, clock_period), groups, os.path.join(output_folder, "cycles"))
+        stage("hamming_distance", vst.write_hamming_results, vcd, os.path.join(output_folder, "hd"), name)
+
+    changes = vcd.stats["changes_kept"]
+    stages = stage_results(metrics, peaks, file_bytes, changes)
+    return {"file": name, "steps": steps, "file_bytes": file_bytes, "changes": changes, "stages": stages}
+
+# Get the commit of the vst.py checkout, None outside of a git repository
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(vst.__file__)),
+                                capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+# Benchmark a sweep of generated file sizes
+def run_benchmarks(steps_sweep, options, workdir, cycles=100, jobs=1):
+    """
+    Generates (or reuses from workdir) one VCD file per number of steps and benchmarks each
+    in its own worker process. Returns the results with the machine and commit they ran on.
+    """
+    cases = []
+    for steps in steps_sweep:
+        vcd_path = generated_vcd(workdir, "synth", steps, **options)
+        print(f"Benchmarking {steps} steps ({os.path.getsize(vcd_path) / 1e6:.1f} MB)...")
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            case = executor.submit(run_case, vcd_path, steps, cycles, jobs).result()
+        for stage_name, result in case["stages"].items():
+            print(f"  {stage_name:<40} {result['seconds']:8.3f} s {result['mb_per_s'] or 0:9.2f} MB/s {result['changes_per_s'] or 0:12,} changes/s")
+        cases.append(case)
+
+    meta = {
+        "date": time_module.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "jobs": jobs,
+        "cycles": cycles,
+        "generator": options,
+    }
+    return {"meta": meta, "cases": cases}
+
+##### Benchmark Scenarios
+# The scenarios of the optimization requests. Sizes are given for --scale 1 and shrink
+# linearly with the scale; every measured stage runs in a fresh process for its peak RSS.
+
+# Run fn in a fresh worker process and return its result
+def in_fresh_process(fn, *fn_args):
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(fn, *fn_args).result()
+
+# Scaled size, at least minimum
+def scaled(size, scale, minimum):
+    return max(minimum, int(size * scale))
+
+# Parse a VCD file, keeping a fraction of its signals
+def measure_parse(vcd_path, fraction=1.0, use_cache=False, stage_name="read_value_changes"):
+    metrics, peaks = vst.Metrics(), {}
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull), redirect_stderr(devnull):
+        vcd = vst.VCDPARSE(vcd_path=vcd_path, use_cache=use_cache)
+        with metrics.stage(stage_name):
+            vcd.read_definitions()
+            if fraction < 1:
+                references = vcd.get_signals()
+                vcd.select(references[:max(1, int(len(references) * fraction))])
+            vcd.read_value_changes()
+        peaks[stage_name] = (vst.peak_rss() or {}).get("self")
+    return stage_results(metrics, peaks, os.path.getsize(vcd_path), vcd.stats["changes_kept"] or None)
+
+# Selection sweep (user-001): parse 1%, 10% and all of the signals of one dump
+def scenario_selection(workdir, scale):
+    vcd_path = generated_vcd(workdir, "selection", scaled(1000000, scale, 1000), signals=1000)
+    stages = {}
+    for fraction in (0.01, 0.1, 1.0):
+        stages.update(in_fresh_process(measure_parse, vcd_path, fraction, False, f"read_value_changes_{fraction:.0%}"))
+    return {"file_bytes": os.path.getsize(vcd_path), "stages": stages}
+
+# Column bytes of the parsed histories against the same histories as lists of (time, value) tuples
+def measure_columns(vcd_path):
+    metrics, peaks = vst.Metrics(), {}
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull), redirect_stderr(devnull):
+        vcd = vst.VCDPARSE(vcd_path=vcd_path)
+        vcd.read_definitions()
+        timed_stage(metrics, peaks, "read_value_changes", vcd.read_value_changes)
+    histories = [signal.tv for signal in vcd.data.values()]
+    column_bytes = sum(tv.times.itemsize * len(tv.times) + tv.codes.itemsize * len(tv.codes)
+                       + sum(map(sys.getsizeof, tv._table)) for tv in histories)
+    tracemalloc.start()
+    tuple_lists = timed_stage(metrics, peaks, "tuple_lists", lambda: [list(tv) for tv in histories])
+    tuple_list_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tuple_lists
+    return {"changes": vcd.stats["changes_kept"], "column_bytes": column_bytes, "tuple_list_bytes": tuple_list_bytes,
+            "stages": stage_results(metrics, peaks)}
+
+# Tuple lists against columns (user-002) on a dump of about 10M changes
+def scenario_columns(workdir, scale):
+    vcd_path = generated_vcd(workdir, "columns", scaled(1700000, scale, 1000), signals=100)
+    return in_fresh_process(measure_columns, vcd_path)
+
+# Cold and warm cache (user-005): parse without cache, build it, then load from it
+def scenario_cache(workdir, scale):
+    vcd_path = generated_vcd(workdir, "cache", scaled(200000, scale, 1000), signals=1000)
+    for suffix in ('.vstidx', '.vstcol', '.vsttix'):
+        if os.path.exists(vcd_path + suffix):
+            os.remove(vcd_path + suffix)
+    stages = {}
+    stages.update(in_fresh_process(measure_parse, vcd_path, 1.0, False, "no_cache"))
+    stages.update(in_fresh_process(measure_parse, vcd_path, 1.0, True, "cold"))
+    stages.update(in_fresh_process(measure_parse, vcd_path, 1.0, True, "warm"))
+    stages.update(in_fresh_process(measure_parse, vcd_path, 0.1, True, "warm_10%"))
+    return {"file_bytes": os.path.getsize(vcd_path), "stages": stages}
+
+# Enable windows and monitoring of a dump, with the number of windows found
+def measure_enable(vcd_path):
+    metrics, peaks = vst.Metrics(), {}
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull), redirect_stderr(devnull):
+        vcd = vst.VCDPARSE(vcd_path=vcd_path)
+        vcd.read_definitions()
+        timed_stage(metrics, peaks, "read_value_changes", vcd.read_value_changes)
+        windows = timed_stage(metrics, peaks, "find_enable_windows", vst.find_enable_windows, vcd, ["top.en"])
+        timed_stage(metrics, peaks, "monitor_signals_enable", vst.monitor_signals, vcd, vcd.get_signals(), ["top.en"])
+    return {"timesteps": vcd.get_endtime() - vcd.get_begintime(), "windows": len(windows),
+            "stages": stage_results(metrics, peaks, os.path.getsize(vcd_path), vcd.stats["changes_kept"])}
+
+# Enable windows over a 1e9-timestep dump (user-008); the span stays 1e9 at every scale
+def scenario_long_span(workdir, scale):
+    steps = scaled(1000000, scale, 1000)
+    vcd_path = generated_vcd(workdir, "long_span", steps, signals=100, enable_rate=0.001, time_step=10 ** 9 // steps)
+    return in_fresh_process(measure_enable, vcd_path)
+
+# Monitoring with 10k enable windows (user-009); the scale only changes the number of signals
+def scenario_many_windows(workdir, scale):
+    vcd_path = generated_vcd(workdir, "many_windows", 80000, signals=scaled(1000, scale, 10), enable_rate=0.25)
+    return in_fresh_process(measure_enable, vcd_path)
+
+# Per-cycle VCD files of all signals, one cycle every two steps
+def measure_cycles(vcd_path, cycles):
+    metrics, peaks = vst.Metrics(), {}
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull), redirect_stderr(devnull), \
+         tempfile.TemporaryDirectory() as output_folder:
+        vcd = vst.VCDPARSE(vcd_path=vcd_path)
+        vcd.read_definitions()
+        timed_stage(metrics, peaks, "read_value_changes", vcd.read_value_changes)
+        groups = timed_stage(metrics, peaks, "monitor_signals", vst.monitor_signals, vcd, vcd.get_signals(), [])
+        cycle_times = vst.periodic_cycle_times(vcd.get_begintime(), vcd.get_begintime() + 2 * cycles, 2)
+        timed_stage(metrics, peaks, "generate_vcd_files_with_groups", vst.generate_vcd_files_with_groups,
+                    vcd, cycle_times, groups, output_folder)
+        files = vst.tree_size(output_folder)[1]
+    return {"cycles": cycles, "signals": len(vcd.get_signals()), "files": files,
+            "stages": stage_results(metrics, peaks, os.path.getsize(vcd_path), vcd.stats["changes_kept"])}
+
+# Per-cycle VCD files at 100k cycles x 10k signals (user-010); at full scale this writes about 10 GB
+def scenario_cycles(workdir, scale):
+    cycles = scaled(100000, scale, 100)
+    vcd_path = generated_vcd(workdir, "cycles", 2 * cycles + 1, signals=scaled(10000, scale, 100), density=0.01)
+    return in_fresh_process(measure_cycles, vcd_path, cycles)
+
+SCENARIOS = {
+    "selection": scenario_selection,
+    "columns": scenario_columns,
+    "cache": scenario_cache,
+    "long_span": scenario_long_span,
+    "many_windows": scenario_many_windows,
+    "cycles": scenario_cycles,
+}
+
+# Run benchmark scenarios by name
+def run_scenarios(names, workdir, scale):
+    """
+    Runs the named scenarios of SCENARIOS on files generated in (or reused from) workdir.
+    Returns the results with the machine and commit they ran on.
+    """
+    scenarios = {}
+    for name in names:
+        print(f"Scenario {name}...")
+        scenario = SCENARIOS[name](workdir, scale)
+        for stage_name, result in scenario["stages"].items():
+            print(f"  {stage_name:<40} {result['seconds']:8.3f} s {(result['peak_rss'] or 0) / 1e6:9.1f} MB peak")
+        for key, value in scenario.items():
+            if key != "stages":
+                print(f"  {key:<40} {value}")
+        scenarios[name] = scenario
+
+    meta = {
+        "date": time_module.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "scale": scale,
+    }
+    return {"meta": meta, "scenarios": scenarios}
+
+# Get the stages of a results file per case label
+def result_stages(results):
+    if "scenarios" in results:
+        return {name: scenario["stages"] for name, scenario in results["scenarios"].items()}
+    return {f"{case['steps']} steps": case["stages"] for case in results["cases"]}
+
+# Print the speedup of results over a baseline, per file size or scenario and stage
+def compare_results(baseline, results):
+    print(f"Baseline {baseline['meta'].get('commit')} vs {results['meta'].get('commit')}:")
+    baseline_stages = result_stages(baseline)
+    for label, stages in result_stages(results).items():
+        reference = baseline_stages.get(label)
+        if reference is None:
+            continue
+        print(f"{label}:")
+        for stage_name, result in stages.items():
+            if stage_name not in reference:
+                continue
+            before, after = reference[stage_name]["seconds"], result["seconds"]
+            speedup = f"{before / after:6.2f}x" if after else "     -"
+            print(f"  {stage_name:<40} {before:8.3f} s -> {after:8.3f} s {speedup}")
+
+##### Main Function
+if __name__ == "__main__":
+
+    args = parse_args()
+
+    if args.command == "generate":
+        start = time_module.time()
+        changes = generate_vcd(args.vcd_file, args.steps, **generator_options(args))
+        print(f"Wrote {changes} value changes ({os.path.getsize(args.vcd_file) / 1e6:.1f} MB) to {args.vcd_file} "
+              f"in {time_module.time() - start:.2f} seconds.")
+
+    elif args.command == "run":
+        results = run_benchmarks(args.steps, generator_options(args), args.workdir, args.cycles, args.jobs)
+        with open(args.results, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Results written to {args.results}.")
+        if args.compare:
+            with open(args.compare) as f:
+                compare_results(json.load(f), results)
+
+    elif args.command == "scenarios":
+        results = run_scenarios(args.only or list(SCENARIOS), args.workdir, args.scale)
+        with open(args.results, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Results written to {args.results}.")
+        if args.compare:
+            with open(args.compare) as f:
+                compare_results(json.load(f), results)
+
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.results) as f:
+            results = json.load(f)
+        compare_results(baseline, results)